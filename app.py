@@ -1,14 +1,28 @@
 import streamlit as st
 import pandas as pd
+import altair as alt
 import calendar
-from datetime import datetime, timedelta
-import json
-import uuid
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+import io
+from datetime import date, datetime, timedelta
+import time
 import numpy as np
 from openai import OpenAI
-from qdrant_client.models import PayloadSchemaType
+
+from ogrodniczka import konfiguracja
+from ogrodniczka.baza import (
+    polacz, przygotuj_kolekcje, tryb_zadan, zapisz_uprawy_do_bazy, dodaj_uprawe_do_bazy, zapisz_zmiany_uprawy,
+    dodaj_zadania_do_bazy, usun_zadanie_z_bazy, usun_uprawe_z_bazy, zapisz_wybrane_uprawy_do_bazy,
+    przenies_ogrod_na_rok
+)
+from ogrodniczka.generowanie import wygeneruj_kalendarz_z_cache, wygeneruj_wiele_kalendarzy
+from ogrodniczka.ics import kalendarz_ics
+from ogrodniczka.indeks import (
+    DNI_TYGODNIA, wczytaj_dane, pobierz_zadania_na_dzien, pobierz_zadania_w_zakresie, pobierz_indeksy,
+    pobierz_zadania_do_edycji, pobierz_przeglad_roku, pobierz_siatke_miesiaca
+)
+from ogrodniczka.kopie import FORMATY_KOPII, eksportuj_kopie, rekordy_z_pliku, importuj_kopie
+from ogrodniczka.model import Uprawa, Zadanie, utworz_uprawa_id
+from ogrodniczka.wyszukiwanie import PORY_ROKU, utworz_embedder, szukaj_semantycznie, podobne_kalendarze
 
 # Konfiguracja strony
 st.set_page_config(
@@ -25,370 +39,271 @@ def init_openai():
         return None
     return OpenAI(api_key=api_key)
 
-# Funkcja agenta OpenAI do generowania kalendarza upraw
-def wygeneruj_kalendarz_upraw(client_openai, nazwa_uprawy, rok=2025):
-    if not client_openai:
-        return None
-    
-    prompt = f"""
-    Jesteś ekspertem ogrodnikiem. Przygotuj kompletny kalendarz upraw dla rośliny: {nazwa_uprawy} na rok {rok}.
-    
-    Zwróć odpowiedź w formacie JSON z następującą strukturą:
-    {{
-        "nazwa": "Nazwa rośliny",
-        "zadania": [
-            {{
-                "data": "YYYY-MM-DD",
-                "opis": "Opis zadania"
-            }}
-        ]
-    }}
-    
-    Uwzględnij wszystkie kluczowe etapy uprawy:
-    - Przygotowanie ziemi/podłoża
-    - Wysiew nasion lub sadzenie rozsady
-    - Pielęgnację (podlewanie, nawożenie, odchwaszczanie)
-    - Formowanie (przycinanie, podpieranie)
-    - Zbiór i przechowywanie
-    - Przygotowanie do zimy (jeśli dotyczy)
-    
-    Uwzględnij klimat umiarkowany (Polska) i podaj realistyczne daty dla każdego zadania.
-    Każde zadanie powinno mieć konkretny, praktyczny opis.
-    
-    Zwróć tylko JSON, bez dodatkowych komentarzy.
-    """
-    
-    try:
-        response = client_openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Jesteś ekspertem ogrodnikiem i zwracasz odpowiedzi wyłącznie w formacie JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1500
-        )
-        
-        # Parsuj odpowiedź JSON
-        response_text = response.choices[0].message.content.strip()
-        
-        # Usuń potencjalne markdown formatting
-        if response_text.startswith("```json"):
-            response_text = response_text[7:-3]
-        elif response_text.startswith("```"):
-            response_text = response_text[3:-3]
-        
-        kalendarz = json.loads(response_text)
-        return kalendarz
-        
-    except Exception as e:
-        st.error(f"Błąd generowania kalendarza: {e}")
-        return None
-    
-# Inicjalizacja klienta Qdrant
+# Gdzie trzymana jest baza: serwer Qdrant (QDRANT_URL), lokalny katalog
+# (QDRANT_PATH) albo pamięć procesu, gdy żadne nie jest ustawione
+def lokalizacja_qdrant():
+    if st.secrets.get("QDRANT_URL"):
+        return "serwer"
+    if st.secrets.get("QDRANT_PATH"):
+        return "katalog"
+    return "pamiec"
+
+# Inicjalizacja klienta Qdrant. Bez serwera qdrant-client działa w procesie
+# (tryb lokalny) z tym samym API - pozostałe funkcje bazy się nie zmieniają,
+# a odczyty nie idą przez sieć. Katalog może być otwarty tylko przez jeden
+# proces naraz.
 @st.cache_resource
 def init_qdrant():
     try:
-        url = st.secrets["QDRANT_URL"]
-        api_key = st.secrets.get("QDRANT_API_KEY", None)
-
-        client = QdrantClient(url=url, api_key=api_key)
-        return client
+        return polacz(
+            url=st.secrets.get("QDRANT_URL"), path=st.secrets.get("QDRANT_PATH"),
+            api_key=st.secrets.get("QDRANT_API_KEY", None)
+        )
     except Exception as e:
         st.error(f"❌ Nie można połączyć z Qdrant: {e}")
         st.stop()
 
-# Inicjalizacja kolekcji
-def init_collections(client):
-    collection_name = "kalendarz_ogrodnika"
-    
-    try:
-        # Sprawdź czy kolekcja istnieje
-        collections = client.get_collections()
-        collection_exists = any(col.name == collection_name for col in collections.collections)
-        
-        if not collection_exists:
-            # Utwórz kolekcję
-            client.create_collection(
-                collection_name=collection_name,
-                vectors_config=VectorParams(size=1, distance=Distance.COSINE),
-                optimizers_config=None,
-                on_disk_payload=True
-            )
-            st.success("Utworzono nową kolekcję")
-            # Tworzymy indeksy tylko dla nowej kolekcji i pokazujemy komunikaty
-            try:
-                client.create_payload_index(
-                    collection_name=collection_name,
-                    field_name="type",
-                    field_schema=PayloadSchemaType.KEYWORD
-                )
-                st.success("Utworzono indeks dla pola 'type'")
-            except Exception as e:
-                if "already exists" in str(e).lower():
-                    pass
-                else:
-                    st.warning(f"Indeks 'type': {e}")
-            try:
-                client.create_payload_index(
-                    collection_name=collection_name,
-                    field_name="uprawa_id",
-                    field_schema=PayloadSchemaType.KEYWORD
-                )
-                st.success("Utworzono indeks dla pola 'uprawa_id'")
-            except Exception as e:
-                if "already exists" in str(e).lower():
-                    pass
-                else:
-                    st.warning(f"Indeks 'uprawa_id': {e}")
-        else:
-            # Jeśli kolekcja już istnieje, próbujemy utworzyć indeksy, ale nie pokazujemy komunikatów
-            try:
-                client.create_payload_index(
-                    collection_name=collection_name,
-                    field_name="type",
-                    field_schema=PayloadSchemaType.KEYWORD
-                )
-            except Exception as e:
-                if "already exists" in str(e).lower():
-                    pass
-                else:
-                    st.warning(f"Indeks 'type': {e}")
-            try:
-                client.create_payload_index(
-                    collection_name=collection_name,
-                    field_name="uprawa_id",
-                    field_schema=PayloadSchemaType.KEYWORD
-                )
-            except Exception as e:
-                if "already exists" in str(e).lower():
-                    pass
-                else:
-                    st.warning(f"Indeks 'uprawa_id': {e}")
-
-        # Dodaj domyślne uprawy tylko dla nowej kolekcji
-        if not collection_exists:
-            default_uprawy = {
-                'pomidory': {
-                    'nazwa': 'Pomidory',
-                    'zadania': [
-                        {'data': '2025-03-15', 'opis': 'Wysiew nasion na rozsadę'},
-                        {'data': '2025-05-15', 'opis': 'Przesadzanie rozsady do gruntu'},
-                        {'data': '2025-06-01', 'opis': 'Podlewanie i nawożenie'},
-                        {'data': '2025-07-01', 'opis': 'Zbieranie pierwszych owoców'},
-                        {'data': '2025-08-15', 'opis': 'Regularne zbieranie owoców'}
-                    ]
-                },
-                'marchew': {
-                    'nazwa': 'Marchew',
-                    'zadania': [
-                        {'data': '2025-04-01', 'opis': 'Wysiew nasion do gruntu'},
-                        {'data': '2025-05-01', 'opis': 'Przerzedzanie siewek'},
-                        {'data': '2025-06-15', 'opis': 'Regularne podlewanie'},
-                        {'data': '2025-09-01', 'opis': 'Zbieranie marchewki'}
-                    ]
-                },
-                'ogorki': {
-                    'nazwa': 'Ogórki',
-                    'zadania': [
-                        {'data': '2025-04-15', 'opis': 'Wysiew nasion na rozsadę'},
-                        {'data': '2025-05-20', 'opis': 'Przesadzanie do gruntu'},
-                        {'data': '2025-06-10', 'opis': 'Podpieranie roślin'},
-                        {'data': '2025-07-15', 'opis': 'Zbieranie owoców'}
-                    ]
-                }
-            }
-            
-            for uprawa_id, uprawa_data in default_uprawy.items():
-                dodaj_uprawe_do_bazy(client, uprawa_id, uprawa_data)
-            
-            st.success("Dodano domyślne uprawy")
-        
-        return collection_name
-    except Exception as e:
-        st.error(f"Błąd inicjalizacji kolekcji: {e}")
-        st.stop()
-
-# Funkcje do operacji na bazie danych
-
-def dodaj_uprawe_do_bazy(client, uprawa_id, uprawa_data):
-    collection_name = "kalendarz_ogrodnika"
-    point = PointStruct(
-        id=str(uuid.uuid4()),
-        vector=[1.0],  # Dummy vector
-        payload={
-            "type": "uprawa",
-            "uprawa_id": uprawa_id,
-            "nazwa": uprawa_data['nazwa'],
-            "zadania": uprawa_data['zadania']
-        }
-    )
-    client.upsert(collection_name=collection_name, points=[point])
+# Kolekcje i migracje schematu - raz na proces, a nie przy każdym przeładowaniu
+@st.cache_resource
+def init_collections(_client):
+    return przygotuj_kolekcje(_client)
 
-def pobierz_uprawy_z_bazy(client):
-    collection_name = "kalendarz_ogrodnika"
+# Zapis wybranych upraw razem z listą zapamiętaną w sesji
+def zapisz_wybrane_uprawy(client, wybrane_uprawy):
     try:
-        # Pobierz wszystkie uprawy
-        results = client.scroll(
-            collection_name=collection_name,
-            scroll_filter={"must": [{"key": "type", "match": {"value": "uprawa"}}]},
-            limit=1000
-        )
-        uprawy = {}
-        for point in results[0]:
-            payload = point.payload
-            uprawy[payload['uprawa_id']] = {
-                'nazwa': payload['nazwa'],
-                'zadania': payload['zadania']
-            }
-        return uprawy
+        zapisz_wybrane_uprawy_do_bazy(client, wybrane_uprawy)
+        _zapamietaj_wybrane_uprawy(wybrane_uprawy)
+        # Zapis obejmuje też ewentualne zmiany czekające na zapis z opóźnieniem
+        st.session_state.pop('wybrane_do_zapisu', None)
     except Exception as e:
-        st.error(f"Błąd pobierania upraw z bazy: {e}")
-        return {}
+        st.error(f"Błąd zapisywania ustawień: {e}")
 
-def pobierz_wybrane_uprawy_z_bazy(client):
-    collection_name = "kalendarz_ogrodnika"
-    try:
-        # Pobierz ustawienia wybranych upraw
-        results = client.scroll(
-            collection_name=collection_name,
-            scroll_filter={"must": [{"key": "type", "match": {"value": "ustawienia"}}]},
-            limit=1
-        )
-        if results[0]:
-            return results[0][0].payload.get('wybrane_uprawy', [])
-        else:
-            return []
-    except Exception as e:
-        return []
+# Szybkie przełączanie upraw w multiselect nie zapisuje każdej zmiany: lista
+# jest od razu aktualizowana w sesji, a do bazy trafia dopiero ostatnia wersja,
+# gdy przez OPOZNIENIE_ZAPISU_USTAWIEN sekund nie było kolejnych zmian.
+# Fragment odpytujący jest wywoływany tylko wtedy, gdy coś czeka na zapis.
+OPOZNIENIE_ZAPISU_USTAWIEN = 2.0
+
+def zaplanuj_zapis_wybranych(wybrane_uprawy):
+    _zapamietaj_wybrane_uprawy(wybrane_uprawy)
+    st.session_state['wybrane_do_zapisu'] = (list(wybrane_uprawy), time.time())
+
+@st.fragment(run_every=OPOZNIENIE_ZAPISU_USTAWIEN)
+def zapisz_oczekujace_ustawienia(client):
+    oczekujace = st.session_state.get('wybrane_do_zapisu')
+    if oczekujace and time.time() - oczekujace[1] >= OPOZNIENIE_ZAPISU_USTAWIEN:
+        zapisz_wybrane_uprawy(client, oczekujace[0])
+        if 'wybrane_do_zapisu' not in st.session_state:
+            # Przeładowanie bez oczekującego zapisu kończy odpytywanie
+            st.rerun()
 
-def zapisz_wybrane_uprawy_do_bazy(client, wybrane_uprawy):
-    collection_name = "kalendarz_ogrodnika"
-    try:
-        # Usuń stare ustawienia
-        from qdrant_client.models import Filter, FieldCondition, MatchValue
-        client.delete(
-            collection_name=collection_name,
-            points_selector=Filter(
-                must=[
-                    FieldCondition(
-                    key="type",
-                    match=MatchValue(value="ustawienia")
-                    )
-                ]       
-            )
-        )
-        # Dodaj nowe ustawienia
-        point = PointStruct(
-            id=str(uuid.uuid4()),
-            vector=[1.0],
-            payload={
-                "type": "ustawienia",
-                "wybrane_uprawy": wybrane_uprawy
-            }
-        )
-        client.upsert(collection_name=collection_name, points=[point])
-    except Exception as e:
-        st.error(f"Błąd zapisywania ustawień: {e}")
+# Lata do wyboru przy generowaniu: bieżący i dwa kolejne
+def lata_upraw():
+    rok = date.today().year
+    return [rok, rok + 1, rok + 2]
+
+@st.cache_resource
+def init_embedder(_client_openai):
+    return utworz_embedder(_client_openai, st.secrets.get("EMBEDDINGI", "openai"))
+
+# --- Warstwa danych ---
+# Uprawy, ustawienia i indeksy są trzymane w sesji i przeliczane tylko po
+# zmianie wersji danych (zapis lub ręczne odświeżenie), a nie przy każdym
+# przeładowaniu skryptu. Kliknięcie dnia nie wymaga więc zapytań do bazy.
+def uniewaznij_dane():
+    st.session_state['wersja_danych'] = st.session_state.get('wersja_danych', 0) + 1
+
+def pobierz_dane(client):
+    wersja = st.session_state.get('wersja_danych', 0)
+    dane = st.session_state.get('dane')
+    if dane is not None and dane['wersja'] == wersja:
+        return dane
 
-def usun_uprawe_z_bazy(client, uprawa_id):
-    collection_name = "kalendarz_ogrodnika"
-    
     try:
-        client.delete(
-            collection_name=collection_name,
-            points_selector={"filter": {"must": [
-                {"key": "type", "match": {"value": "uprawa"}},
-                {"key": "uprawa_id", "match": {"value": uprawa_id}}
-            ]}}
-        )
+        dane = wczytaj_dane(client, wersja)
     except Exception as e:
-        st.error(f"Błąd usuwania uprawy: {e}")
+        # Bez odczytanych ustawień nie zapisujemy domyślnego wyboru upraw
+        st.error(f"Błąd wczytywania danych: {e}")
+        st.stop()
+    st.session_state['dane'] = dane
+    oczekujace = st.session_state.get('wybrane_do_zapisu')
+    if oczekujace:
+        # Wybór czekający na zapis z opóźnieniem jest nowszy niż ten w bazie
+        dane['wybrane_uprawy'] = [uprawa_id for uprawa_id in oczekujace[0] if uprawa_id in dane['uprawy']]
+    elif dane['wybrane_uprawy'] is None:
+        # Brak zapisanych ustawień - domyślnie pokazujemy wszystkie uprawy
+        dane['wybrane_uprawy'] = list(dane['uprawy'].keys())
+        if dane['uprawy']:
+            zapisz_wybrane_uprawy(client, dane['wybrane_uprawy'])
+    return dane
+
+# --- Edytor zadań ---
+# Zadania uprawy są edytowane stronami po ROZMIAR_STRONY_EDYTORA wierszy w
+# jednym st.data_editor zamiast kilku widżetów na zadanie. Przy zapisie ze
+# stanu edytora brane są tylko zmienione, dodane i usunięte wiersze.
+ROZMIAR_STRONY_EDYTORA = 50
+
+def tabela_zadan(zadania, od, do):
+    strona = zadania[od:do]
+    return pd.DataFrame({
+        'data': [zadanie.data for zadanie in strona],
+        'opis': [zadanie.opis for zadanie in strona],
+        'zrealizowane': [zadanie.zrealizowane for zadanie in strona]
+    })
+
+def _wartosc_z_edytora(pole, wartosc):
+    if pole == 'data':
+        return pd.to_datetime(wartosc).date() if wartosc else None
+    if pole == 'zrealizowane':
+        return bool(wartosc)
+    return wartosc or ''
+
+# Zmiany ze stanu edytora strony zaczynającej się od zadania nr od:
+# {'zmienione': {nr zadania: {pole: wartość}}, 'dodane': [zadania], 'usuniete': [nr zadań]}
+def zmiany_z_edytora(stan, od):
+    zmienione = {}
+    for wiersz, pola in stan.get('edited_rows', {}).items():
+        pola = {pole: _wartosc_z_edytora(pole, wartosc) for pole, wartosc in pola.items()}
+        # Wyczyszczona data albo opis nie nadpisują zapisanych wartości
+        pola = {pole: wartosc for pole, wartosc in pola.items() if wartosc is not None and wartosc != ''}
+        if pola:
+            zmienione[od + int(wiersz)] = pola
+    dodane = []
+    for wiersz in stan.get('added_rows', []):
+        pola = {pole: _wartosc_z_edytora(pole, wiersz.get(pole)) for pole in ('data', 'opis', 'zrealizowane')}
+        if pola['data'] and pola['opis']:
+            dodane.append(Zadanie(**pola))
+    usuniete = [od + int(wiersz) for wiersz in stan.get('deleted_rows', [])]
+    return {'zmienione': zmienione, 'dodane': dodane, 'usuniete': usuniete}
+
+def _zapamietaj_wybrane_uprawy(wybrane_uprawy):
+    # Wybór upraw nie wpływa na indeksy, więc zamiast przeładowywać wszystko
+    # aktualizujemy tylko zapamiętaną listę
+    dane = st.session_state.get('dane')
+    if dane is not None:
+        dane['wybrane_uprawy'] = list(wybrane_uprawy)
+
+# Rdzeń pracuje w trybie przechowywania z secrets, komunikaty pokazuje jako
+# elementy Streamlit, a każdy zapis unieważnia dane sesji
+konfiguracja.tryb_przechowywania = st.secrets.get("TRYB_PRZECHOWYWANIA", "uprawy")
+konfiguracja.zglos = lambda poziom, tekst: getattr(st, poziom)(tekst)
+konfiguracja.po_zapisie = uniewaznij_dane
 
 # Inicjalizacja
 client = init_qdrant()
 client_openai = init_openai()
-collection_name = init_collections(client)
-
-# --- Pobieranie upraw zawsze na bieżąco (na początku pętli) ---
-uprawy = pobierz_uprawy_z_bazy(client)
-wybrane_uprawy = pobierz_wybrane_uprawy_z_bazy(client)
-if uprawy and not wybrane_uprawy:
-    wybrane_uprawy = list(uprawy.keys())
-    zapisz_wybrane_uprawy_do_bazy(client, wybrane_uprawy)
-
-# Funkcja do pobierania zadań na dany dzień
-def pobierz_zadania_na_dzien(data, uprawy, wybrane_uprawy):
-    zadania = []
-    for uprawa_id, uprawa in uprawy.items():
-        if uprawa_id in wybrane_uprawy:
-            for zadanie in uprawa['zadania']:
-                if zadanie['data'] == data.strftime('%Y-%m-%d'):
-                    zadania.append({
-                        'uprawa': uprawa['nazwa'],
-                        'opis': zadanie['opis']
-                    })
-    return zadania
-
-# Funkcja do pobierania zadań w zakresie dat
-def pobierz_zadania_w_zakresie(data_od, data_do, uprawy, wybrane_uprawy):
-    zadania = []
-    for uprawa_id, uprawa in uprawy.items():
-        if uprawa_id in wybrane_uprawy:
-            for zadanie in uprawa['zadania']:
-                zadanie_data = datetime.strptime(zadanie['data'], '%Y-%m-%d').date()
-                if data_od <= zadanie_data <= data_do:
-                    zadania.append({
-                        'data': zadanie_data,
-                        'uprawa': uprawa['nazwa'],
-                        'opis': zadanie['opis']
-                    })
-    return sorted(zadania, key=lambda x: x['data'])
-
-# --- KALENDARZ: emoji kwadraty ---
-def rysuj_kalendarz(rok, miesiac, uprawy, wybrane_uprawy):
-    cal = calendar.monthcalendar(rok, miesiac)
+embedder = init_embedder(client_openai)
+try:
+    collection_name, komunikaty_schematu = init_collections(client)
+except Exception as e:
+    st.error(f"Błąd inicjalizacji kolekcji: {e}")
+    st.stop()
+if not st.session_state.get('schemat_zgloszony'):
+    # Komunikaty z inicjalizacji pokazujemy tylko raz w sesji
+    st.session_state['schemat_zgloszony'] = True
+    for komunikat in komunikaty_schematu:
+        st.success(komunikat)
+
+dane = pobierz_dane(client)
+uprawy = dane['uprawy']
+wybrane_uprawy = dane['wybrane_uprawy']
+
+def _wybierz_dzien(klucz, daty):
+    # Wywoływane tylko przy zmianie zaznaczenia, przed wykonaniem skryptu
+    komorki = st.session_state[klucz].selection.cells
+    if not komorki:
+        return
+    wiersz, kolumna = komorki[0]
+    data = daty[wiersz][DNI_TYGODNIA.index(kolumna)]
+    if data:
+        st.session_state['context_day'] = data
+        st.session_state['context_action'] = 'menu'
+        st.session_state['selected_day'] = data
+
+def rysuj_kalendarz(rok, miesiac, siatka):
     nazwa_miesiaca = calendar.month_name[miesiac]
     st.subheader(f"{nazwa_miesiaca} {rok}")
 
-    dni_tygodnia = ['Pon', 'Wt', 'Śr', 'Czw', 'Pt', 'Sob', 'Nie']
-    cols = st.columns(7)
-    for i, dzien in enumerate(dni_tygodnia):
-        cols[i].markdown(f"**{dzien}**")
-
-    for tydzien in cal:
-        cols = st.columns(7)
-        for i, dzien in enumerate(tydzien):
-            if dzien == 0:
-                cols[i].markdown("<div style='height:48px'></div>", unsafe_allow_html=True)
-            else:
-                data = datetime(rok, miesiac, dzien).date()
-                # Zbierz emoji upraw z zadaniami na ten dzień
-                emoji_list = []
-                for uprawa_id, uprawa in uprawy.items():
-                    if uprawa_id in wybrane_uprawy:
-                        for zad in uprawa['zadania']:
-                            if zad['data'] == data.strftime('%Y-%m-%d'):
-                                emoji_list.append(uprawa.get('emoji', '🟩'))
-                                break
-                key_btn = f"day_{rok}_{miesiac}_{dzien}"
-                is_selected = st.session_state.get('selected_day') == str(data)
-                # Emoji dla każdej uprawy z zadaniem
-                label = f"{''.join(emoji_list)} {dzien}" if emoji_list else f"{dzien}"
-                if cols[i].button(label, key=key_btn, use_container_width=True):
-                    st.session_state['context_day'] = str(data)
-                    st.session_state['context_action'] = 'menu'
-                    st.session_state['selected_day'] = str(data)
+    klucz = f"siatka_{rok}_{miesiac}"
+    zaznaczenie = None
+    selected_day = st.session_state.get('selected_day')
+    for wiersz, daty_tygodnia in enumerate(siatka['daty']):
+        if selected_day in daty_tygodnia:
+            kolumna = DNI_TYGODNIA[daty_tygodnia.index(selected_day)]
+            zaznaczenie = {'selection': {'cells': [(wiersz, kolumna)]}}
+    st.dataframe(
+        siatka['tabela'],
+        hide_index=True,
+        key=klucz,
+        on_select=lambda: _wybierz_dzien(klucz, siatka['daty']),
+        selection_mode="single-cell",
+        selection_default=zaznaczenie
+    )
     # Legenda pod kalendarzem
-    legenda = []
-    for uprawa_id in wybrane_uprawy:
-        uprawa = uprawy.get(uprawa_id)
-        if uprawa:
-            emoji = uprawa.get('emoji', '🟩')
-            nazwa = uprawa['nazwa']
-            legenda.append(f"{emoji} {nazwa}")
-    if legenda:
-        st.markdown("**Legenda:** " + " &nbsp; ".join(legenda))
+    if siatka['legenda']:
+        st.markdown("**Legenda:** " + " &nbsp; ".join(siatka['legenda']))
+
+
+def rysuj_przeglad_roku(przeglad, uprawy, wybrane_uprawy):
+    wybrane = set(wybrane_uprawy)
+    maska = np.array([uprawa_id in wybrane for uprawa_id in przeglad['uprawy']], dtype=bool)
+    uprawy_ids = [uprawa_id for uprawa_id in przeglad['uprawy'] if uprawa_id in wybrane]
+    macierz = przeglad['macierz'][maska]
+    dni = przeglad['dni']
+    dzienne = macierz.sum(axis=0)
+    if not dzienne.any():
+        st.info("Brak zadań wybranych upraw w tym roku.")
+        return
+
+    # Dzień tygodnia (pon=0; 1970-01-01 to czwartek), numer tygodnia i miesiąc
+    dzien_tygodnia = (dni.astype(np.int64) + 3) % 7
+    tydzien = (np.arange(len(dni)) + dzien_tygodnia[0]) // 7
+    miesiace = dni.astype('datetime64[M]').astype(np.int64) % 12 + 1
+
+    # Obciążenie w porach roku
+    pory = pd.Series(dzienne).groupby(pd.Series(miesiace).map(PORY_ROKU)).sum()
+    for kolumna, pora in zip(st.columns(4), ['wiosna', 'lato', 'jesień', 'zima']):
+        kolumna.metric(pora.capitalize(), int(pory.get(pora, 0)))
+
+    st.subheader("Zadania w kolejnych dniach")
+    dzienne_df = pd.DataFrame({
+        'data': dni,
+        'tydzien': tydzien,
+        'dzien': np.array(DNI_TYGODNIA)[dzien_tygodnia],
+        'zadania': dzienne
+    })
+    st.altair_chart(
+        alt.Chart(dzienne_df).mark_rect().encode(
+            x=alt.X('tydzien:O', title='Tydzień', axis=alt.Axis(labels=False, ticks=False)),
+            y=alt.Y('dzien:O', sort=DNI_TYGODNIA, title=None),
+            color=alt.Color('zadania:Q', scale=alt.Scale(scheme='greens'), title='Zadania'),
+            tooltip=[alt.Tooltip('data:T', format='%Y-%m-%d'), 'zadania:Q']
+        ),
+        width="stretch"
+    )
+
+    # Najbardziej pracowite tygodnie
+    tygodniowe = np.bincount(tydzien, weights=dzienne).astype(int)
+    szczyty = [t for t in np.argsort(-tygodniowe, kind='stable')[:3] if tygodniowe[t] > 0]
+    st.markdown("**Szczyty pracy:** " + ", ".join(
+        f"tydzień od {dni[tydzien == t][0]}: {tygodniowe[t]} zadań" for t in szczyty
+    ))
+
+    st.subheader("Zadania upraw w miesiącach")
+    poczatki_miesiecy = np.flatnonzero(np.diff(miesiace, prepend=0))
+    miesieczne = np.add.reduceat(macierz, poczatki_miesiecy, axis=1)
+    miesieczne_df = pd.DataFrame(
+        miesieczne, index=[uprawy[uprawa_id].nazwa for uprawa_id in uprawy_ids], columns=range(1, 13)
+    ).rename_axis('uprawa').reset_index().melt(id_vars='uprawa', var_name='miesiac', value_name='zadania')
+    st.altair_chart(
+        alt.Chart(miesieczne_df).mark_rect().encode(
+            x=alt.X('miesiac:O', title='Miesiąc'),
+            y=alt.Y('uprawa:N', title=None),
+            color=alt.Color('zadania:Q', scale=alt.Scale(scheme='greens'), title='Zadania'),
+            tooltip=['uprawa:N', 'miesiac:O', 'zadania:Q']
+        ),
+        width="stretch"
+    )
 
 
 # Główny interfejs
@@ -402,34 +317,74 @@ with st.sidebar:
         st.session_state['main_view'] = 'kalendarz'
     if col_upr.button("Zarządzaj uprawami", key="btn_uprawy"):
         st.session_state['main_view'] = 'uprawy'
+    if st.button("Przegląd roku", key="btn_przeglad"):
+        st.session_state['main_view'] = 'przeglad'
+    if lokalizacja_qdrant() == "pamiec":
+        st.caption("💾 Baza w pamięci - dane znikną po ponownym uruchomieniu. Ustaw QDRANT_PATH lub QDRANT_URL.")
     st.divider()
     
     st.header("Zarządzanie uprawami")
     
     # Status połączenia z bazą
     st.success("🔗 Połączono z bazą Qdrant")
+    if st.button("🔄 Odśwież dane", key="btn_odswiez"):
+        # Pobierz zmiany wprowadzone przez innych użytkowników
+        uniewaznij_dane()
+        st.rerun()
     
     # Wybór upraw do wyświetlenia
     st.subheader("Wybierz uprawy")
     wszystkie_uprawy = list(uprawy.keys())
-    nazwy_upraw = [uprawy[u]['nazwa'] for u in wszystkie_uprawy]
+    nazwy_upraw = [uprawy[u].nazwa for u in wszystkie_uprawy]
     
     wybrane_nazwy = st.multiselect(
         "Uprawy do wyświetlenia:",
         nazwy_upraw,
-        default=[uprawy[u]['nazwa'] for u in wybrane_uprawy if u in uprawy]
+        default=[uprawy[u].nazwa for u in wybrane_uprawy if u in uprawy]
     )
     
     # Aktualizacja wybranych upraw
     nowe_wybrane_uprawy = [
         u for u in wszystkie_uprawy 
-        if uprawy[u]['nazwa'] in wybrane_nazwy
+        if uprawy[u].nazwa in wybrane_nazwy
     ]
     
     if nowe_wybrane_uprawy != wybrane_uprawy:
         wybrane_uprawy = nowe_wybrane_uprawy
-        zapisz_wybrane_uprawy_do_bazy(client, wybrane_uprawy)
+        zaplanuj_zapis_wybranych(wybrane_uprawy)
         st.rerun()
+    if 'wybrane_do_zapisu' in st.session_state:
+        zapisz_oczekujace_ustawienia(client)
+    if wybrane_uprawy:
+        st.download_button(
+            "📲 Kalendarz w telefonie (.ics)",
+            data=lambda: kalendarz_ics(client, uprawy, wybrane_uprawy),
+            file_name="ogrodniczka.ics",
+            mime="text/calendar"
+        )
+    
+    st.divider()
+
+    # Wyszukiwanie semantyczne w uprawach i zadaniach
+    st.subheader("🔎 Szukaj")
+    with st.form("szukaj_semantycznie"):
+        zapytanie = st.text_input("Czego szukasz?", placeholder="np. co przycinać wiosną, uprawy podobne do bazylii")
+        zakres = st.radio("W:", ["wszystko", "uprawy", "zadania"], horizontal=True)
+        szukaj = st.form_submit_button("Szukaj")
+    if szukaj and zapytanie.strip():
+        try:
+            wyniki = szukaj_semantycznie(
+                client, embedder, dane, zapytanie.strip(),
+                typ={"uprawy": "uprawa", "zadania": "zadanie"}.get(zakres)
+            )
+        except Exception as e:
+            st.error(f"Błąd wyszukiwania: {e}")
+            wyniki = []
+        for wynik, payload in wyniki:
+            if payload['type'] == 'uprawa':
+                st.write(f"🌱 **{payload['nazwa']}** ({wynik:.2f})")
+            else:
+                st.write(f"📅 {payload['data']} **{payload['nazwa']}**: {payload['opis']} ({wynik:.2f})")
     
     st.divider()
     
@@ -438,6 +393,10 @@ with st.sidebar:
     
     if client_openai:
         st.success("✅ Agent OpenAI gotowy do pracy")
+
+        # Kalendarze podobnych upraw z ogrodu jako przykłady dla generatora
+        def przyklady_z_ogrodu(nazwy):
+            return podobne_kalendarze(client, embedder, dane, nazwy)
         
         with st.form("pomocnik_upraw"):
             st.write("**Powiedz mi jaką uprawę chcesz dodać, a ja stworzę kompletny kalendarz!**")
@@ -449,7 +408,7 @@ with st.sidebar:
             
             rok_uprawy = st.selectbox(
                 "Rok uprawy:",
-                options=[2025, 2026, 2027],
+                options=lata_upraw(),
                 index=0
             )
             
@@ -467,33 +426,34 @@ with st.sidebar:
                     """)
             
             if generuj_btn and nazwa_uprawy_ai:
+                # Zadania pojawiają się w podglądzie na bieżąco, w miarę generowania
+                with st.expander("👀 Podgląd wygenerowanych zadań", expanded=True):
+                    podglad = st.empty()
+                odebrane = []
+
+                def pokaz_zadanie(zadanie):
+                    odebrane.append(f"**{zadanie['data']}**: {zadanie['opis']}")
+                    podglad.markdown("\n\n".join(odebrane))
+
                 with st.spinner(f"🤖 Generuję kalendarz upraw dla: {nazwa_uprawy_ai}..."):
-                    kalendarz_ai = wygeneruj_kalendarz_upraw(client_openai, nazwa_uprawy_ai, rok_uprawy)
+                    kalendarz_ai = wygeneruj_kalendarz_z_cache(
+                        client, client_openai, nazwa_uprawy_ai, rok_uprawy,
+                        na_zadanie=pokaz_zadanie, dobierz_przyklady=przyklady_z_ogrodu
+                    )
                     
-                    if kalendarz_ai and 'zadania' in kalendarz_ai:
+                    if kalendarz_ai:
                         # Stwórz uprawa_id
-                        uprawa_id = nazwa_uprawy_ai.lower().replace(' ', '_').replace('ą', 'a').replace('ć', 'c').replace('ę', 'e').replace('ł', 'l').replace('ń', 'n').replace('ó', 'o').replace('ś', 's').replace('ź', 'z').replace('ż', 'z')
+                        uprawa_id = utworz_uprawa_id(nazwa_uprawy_ai)
                         
                         # Dodaj do bazy
-                        dodaj_uprawe_do_bazy(client, uprawa_id, {
-                            'nazwa': kalendarz_ai.get('nazwa', nazwa_uprawy_ai),
-                            'zadania': kalendarz_ai['zadania']
-                        })
+                        dodaj_uprawe_do_bazy(client, uprawa_id, kalendarz_ai)
                         
                         # Dodaj do wybranych upraw
                         if uprawa_id not in wybrane_uprawy:
-                            wybrane_uprawy.append(uprawa_id)
-                            zapisz_wybrane_uprawy_do_bazy(client, wybrane_uprawy)
-                        
-                        st.success(f"✅ Kalendarz dla '{kalendarz_ai.get('nazwa', nazwa_uprawy_ai)}' został wygenerowany i dodany!")
-                        st.info(f"📅 Dodano {len(kalendarz_ai['zadania'])} zadań ogrodniczych")
+                            zapisz_wybrane_uprawy(client, wybrane_uprawy + [uprawa_id])
                         
-                        # Pokaż podgląd zadań
-                        with st.expander("👀 Podgląd wygenerowanych zadań"):
-                            for i, zadanie in enumerate(kalendarz_ai['zadania'][:5]):  # Pokaż pierwsze 5 zadań
-                                st.write(f"**{zadanie['data']}**: {zadanie['opis']}")
-                            if len(kalendarz_ai['zadania']) > 5:
-                                st.write(f"... i {len(kalendarz_ai['zadania']) - 5} innych zadań")
+                        st.success(f"✅ Kalendarz dla '{kalendarz_ai.nazwa}' został wygenerowany i dodany!")
+                        st.info(f"📅 Dodano {len(kalendarz_ai.zadania)} zadań ogrodniczych")
                         
                         st.rerun()
                     else:
@@ -501,6 +461,58 @@ with st.sidebar:
             
             elif generuj_btn and not nazwa_uprawy_ai:
                 st.error("⚠️ Podaj nazwę rośliny/uprawy!")
+
+        # Wiele upraw naraz - np. cały katalog nasion wklejony jako lista
+        with st.expander("📋 Wiele upraw naraz"):
+            with st.form("pomocnik_wiele_upraw"):
+                lista_upraw_ai = st.text_area(
+                    "Nazwy roślin (każda w osobnej linii lub po przecinku):",
+                    placeholder="pomidory\nbazylia\ntruskawki"
+                )
+                rok_wielu_upraw = st.selectbox(
+                    "Rok uprawy:",
+                    options=lata_upraw(),
+                    index=0,
+                    key="rok_wielu_upraw"
+                )
+                generuj_wiele_btn = st.form_submit_button("🌱 Wygeneruj kalendarze")
+
+            if generuj_wiele_btn:
+                # Jedna nazwa na uprawę, bez duplikatów
+                nazwy_ai = {}
+                for nazwa in lista_upraw_ai.replace(';', '\n').replace(',', '\n').splitlines():
+                    nazwa = ' '.join(nazwa.split())
+                    if nazwa:
+                        nazwy_ai.setdefault(utworz_uprawa_id(nazwa), nazwa)
+                if not nazwy_ai:
+                    st.error("⚠️ Podaj nazwy roślin/upraw!")
+                else:
+                    pasek = st.progress(0.0, text=f"🤖 Generuję kalendarze: 0/{len(nazwy_ai)}")
+                    gotowe = []
+
+                    def pokaz_postep(nazwa, kalendarz, blad):
+                        gotowe.append(nazwa)
+                        pasek.progress(
+                            len(gotowe) / len(nazwy_ai),
+                            text=f"🤖 Generuję kalendarze: {len(gotowe)}/{len(nazwy_ai)} ({nazwa})"
+                        )
+                        if blad is not None:
+                            st.error(f"❌ {nazwa}: {blad}")
+
+                    kalendarze_ai, bledy_ai = wygeneruj_wiele_kalendarzy(
+                        client, client_openai, list(nazwy_ai.values()), rok_wielu_upraw, pokaz_postep,
+                        dobierz_przyklady=przyklady_z_ogrodu
+                    )
+                    if kalendarze_ai:
+                        # Jeden zapis wsadowy dla wszystkich wygenerowanych upraw
+                        nowe_uprawy = {
+                            utworz_uprawa_id(nazwa): kalendarz for nazwa, kalendarz in kalendarze_ai.items()
+                        }
+                        zapisz_uprawy_do_bazy(client, nowe_uprawy)
+                        zapisz_wybrane_uprawy(
+                            client, wybrane_uprawy + [u for u in nowe_uprawy if u not in wybrane_uprawy]
+                        )
+                        st.success(f"✅ Dodano uprawy z kalendarzami: {len(nowe_uprawy)}")
     else:
         st.warning("⚠️ Brak klucza API OpenAI")
         st.info("""
@@ -514,6 +526,28 @@ with st.sidebar:
     
     st.divider()
     
+    # Przeniesienie wybranych upraw na kolejny sezon - lokalnie, bez OpenAI
+    st.subheader("📆 Nowy sezon")
+    with st.form("nowy_sezon"):
+        rok_biezacy = date.today().year
+        col1, col2 = st.columns(2)
+        with col1:
+            rok_zrodlowy = st.selectbox("Z roku:", range(rok_biezacy - 2, rok_biezacy + 2), index=2)
+        with col2:
+            rok_docelowy = st.selectbox("Na rok:", range(rok_biezacy - 1, rok_biezacy + 3), index=2)
+        if st.form_submit_button("Przenieś wybrane uprawy"):
+            if rok_docelowy == rok_zrodlowy:
+                st.error("Wybierz inny rok docelowy!")
+            else:
+                dodane = przenies_ogrod_na_rok(client, uprawy, wybrane_uprawy, rok_zrodlowy, rok_docelowy)
+                if dodane:
+                    st.success(f"Dodano zadania na rok {rok_docelowy}: {dodane}")
+                    st.rerun()
+                else:
+                    st.info(f"Brak nowych zadań do przeniesienia z roku {rok_zrodlowy}")
+
+    st.divider()
+
     # Dodawanie nowej uprawy
     st.subheader("Dodaj nową uprawę")
     
@@ -531,24 +565,18 @@ with st.sidebar:
                 opis_zadania = st.text_input(f"Opis zadania {i+1}:", key=f"opis_{i}")
             
             if data_zadania and opis_zadania:
-                zadania_nowej_uprawy.append({
-                    'data': data_zadania.strftime('%Y-%m-%d'),
-                    'opis': opis_zadania
-                })
+                zadania_nowej_uprawy.append(Zadanie(data_zadania, opis_zadania))
         
         if st.form_submit_button("Dodaj uprawę"):
             if nazwa_uprawy and zadania_nowej_uprawy:
-                uprawa_id = nazwa_uprawy.lower().replace(' ', '_').replace('ą', 'a').replace('ć', 'c').replace('ę', 'e').replace('ł', 'l').replace('ń', 'n').replace('ó', 'o').replace('ś', 's').replace('ź', 'z').replace('ż', 'z')
+                uprawa_id = utworz_uprawa_id(nazwa_uprawy)
                 
                 # Dodaj do bazy
-                dodaj_uprawe_do_bazy(client, uprawa_id, {
-                    'nazwa': nazwa_uprawy,
-                    'zadania': zadania_nowej_uprawy
-                })
+                dodaj_uprawe_do_bazy(client, uprawa_id, Uprawa(nazwa_uprawy, zadania_nowej_uprawy))
                 
                 # Dodaj do wybranych upraw
-                wybrane_uprawy.append(uprawa_id)
-                zapisz_wybrane_uprawy_do_bazy(client, wybrane_uprawy)
+                if uprawa_id not in wybrane_uprawy:
+                    zapisz_wybrane_uprawy(client, wybrane_uprawy + [uprawa_id])
                 
                 st.success(f"Uprawa '{nazwa_uprawy}' została dodana do bazy!")
                 st.rerun()
@@ -556,6 +584,43 @@ with st.sidebar:
                 st.error("Wypełnij wszystkie pola!")
     
     st.divider()
+
+    # Kopia zapasowa całej kolekcji i jej przywracanie
+    st.subheader("💾 Kopia zapasowa")
+    format_kopii = st.selectbox("Format:", list(FORMATY_KOPII), key="format_kopii")
+
+    def utworz_kopie():
+        plik = io.BytesIO()
+        eksportuj_kopie(client, plik, format_kopii)
+        return plik.getvalue()
+
+    st.download_button(
+        "⬇️ Pobierz kopię",
+        data=utworz_kopie,
+        file_name=f"ogrodniczka_{date.today().isoformat()}.{format_kopii}",
+        mime=FORMATY_KOPII[format_kopii]
+    )
+    with st.form("import_kopii", clear_on_submit=True):
+        plik_kopii = st.file_uploader("Plik kopii:", type=list(FORMATY_KOPII) + ['jsonl'])
+        importuj_btn = st.form_submit_button("⬆️ Importuj")
+    if importuj_btn and plik_kopii:
+        format_pliku = plik_kopii.name.rsplit('.', 1)[-1].lower().replace('jsonl', 'ndjson')
+        try:
+            with st.spinner("Importuję kopię..."):
+                zaimportowane, liczba_zadan, wybrane_z_kopii = importuj_kopie(
+                    client, rekordy_z_pliku(plik_kopii, format_pliku)
+                )
+        except ValueError as e:
+            st.error(f"❌ Błąd importu: {e}")
+        else:
+            nowe_wybrane = wybrane_z_kopii if wybrane_z_kopii is not None else zaimportowane
+            zapisz_wybrane_uprawy(
+                client, wybrane_uprawy + [u for u in nowe_wybrane if u not in wybrane_uprawy]
+            )
+            st.success(f"✅ Zaimportowano uprawy: {len(zaimportowane)}, zadania: {liczba_zadan}")
+            st.rerun()
+
+    st.divider()
     
     # Usuwanie upraw
     st.subheader("Usuń uprawę")
@@ -563,16 +628,16 @@ with st.sidebar:
         uprawa_do_usuniecia = st.selectbox(
             "Wybierz uprawę do usunięcia:",
             options=list(uprawy.keys()),
-            format_func=lambda x: uprawy[x]['nazwa']
+            format_func=lambda x: uprawy[x].nazwa
         )
         
         if st.button("🗑️ Usuń uprawę", type="secondary"):
             if uprawa_do_usuniecia:
-                usun_uprawe_z_bazy(client, uprawa_do_usuniecia)
                 if uprawa_do_usuniecia in wybrane_uprawy:
-                    wybrane_uprawy.remove(uprawa_do_usuniecia)
-                    zapisz_wybrane_uprawy_do_bazy(client, wybrane_uprawy)
-                st.success(f"Uprawa '{uprawy[uprawa_do_usuniecia]['nazwa']}' została usunięta!")
+                    usun_uprawe_z_bazy(client, uprawa_do_usuniecia, [u for u in wybrane_uprawy if u != uprawa_do_usuniecia])
+                else:
+                    usun_uprawe_z_bazy(client, uprawa_do_usuniecia)
+                st.success(f"Uprawa '{uprawy[uprawa_do_usuniecia].nazwa}' została usunięta!")
                 st.rerun()
 
 # Domyślny widok
@@ -598,21 +663,31 @@ if st.session_state['main_view'] == 'kalendarz':
                                   index=dzis.month-1, 
                                   format_func=lambda x: str(calendar.month_name[x]))
         with col_rok:
-            rok = st.selectbox("Rok:", range(2024, 2027), 
-                              index=2025-2024 if dzis.year >= 2025 else 0)
+            rok = st.selectbox("Rok:", range(dzis.year - 1, dzis.year + 3), index=1)
+        # Okna dat potrzebne w tym widoku: miesiąc, dzisiaj z następnym tygodniem
+        # i wskazany dzień
+        okna = [
+            (date(rok, miesiac, 1), date(rok, miesiac, calendar.monthrange(rok, miesiac)[1])),
+            (dzis.date(), dzis.date() + timedelta(days=8))
+        ]
+        for klucz in ('selected_day', 'context_day'):
+            if st.session_state.get(klucz):
+                wskazany = date.fromisoformat(st.session_state[klucz])
+                if not any(od <= wskazany <= do for od, do in okna):
+                    okna.append((wskazany, wskazany))
+        indeks_dat, indeks_zakresow = pobierz_indeksy(client, dane, okna)
         if uprawy:
-            rysuj_kalendarz(rok, miesiac, uprawy, wybrane_uprawy)
+            rysuj_kalendarz(rok, miesiac, pobierz_siatke_miesiaca(dane, indeks_dat, rok, miesiac, wybrane_uprawy))
         else:
             st.info("Brak upraw w bazie danych. Dodaj pierwszą uprawę w panelu bocznym.")
 
         # MENU OPCJI I FORMULARZE POD KALENDARZEM
         if context_day and context_action == 'menu':
             st.markdown(f"### Opcje dla dnia {context_day}")
-            zadania_w_dniu = []
-            for uprawa_id, uprawa in uprawy.items():
-                for zad in uprawa['zadania']:
-                    if zad['data'] == context_day:
-                        zadania_w_dniu.append((uprawa_id, uprawa['nazwa'], zad['opis']))
+            zadania_w_dniu = [
+                (uprawa_id, uprawy[uprawa_id].nazwa, zad.opis)
+                for uprawa_id, _, zad in indeks_dat.get(date.fromisoformat(context_day), [])
+            ]
             col_add, col_del, col_close = st.columns([2,2,1])
             dodaj = col_add.button("➕ Dodaj wydarzenie")
             usun = False
@@ -631,38 +706,40 @@ if st.session_state['main_view'] == 'kalendarz':
             st.markdown(f"### ➕ Dodaj wydarzenie na {context_day}")
             with st.form("add_event_form_main"):
                 uprawa_options = list(uprawy.keys())
-                uprawa_nazwa = st.selectbox("Uprawa:", [uprawy[u]['nazwa'] for u in uprawa_options], key=f"uprawa_add_{context_day}")
+                uprawa_nazwa = st.selectbox("Uprawa:", [uprawy[u].nazwa for u in uprawa_options], key=f"uprawa_add_{context_day}")
                 opis = st.text_input("Opis zadania:", key=f"opis_add_{context_day}")
                 submitted = st.form_submit_button("Dodaj")
                 if submitted and opis and uprawa_nazwa:
-                    uprawa_id = [u for u in uprawa_options if uprawy[u]['nazwa'] == uprawa_nazwa][0]
-                    uprawa = uprawy[uprawa_id]
-                    uprawa['zadania'].append({'data': context_day, 'opis': opis})
-                    dodaj_uprawe_do_bazy(client, uprawa_id, uprawa)
-                    st.success("Dodano wydarzenie!")
-                    st.session_state['context_action'] = None
-                    st.session_state['context_day'] = None
-                    st.rerun()
+                    uprawa_id = [u for u in uprawa_options if uprawy[u].nazwa == uprawa_nazwa][0]
+                    if dodaj_zadania_do_bazy(client, {uprawa_id: [Zadanie(date.fromisoformat(context_day), opis)]}, uprawy):
+                        st.success("Dodano wydarzenie!")
+                        st.session_state['context_action'] = None
+                        st.session_state['context_day'] = None
+                        st.rerun()
 
         if context_day and context_action == 'remove':
             st.markdown(f"### 🗑️ Usuń wydarzenie z {context_day}")
-            zadania_do_usuniecia = []
-            for uprawa_id, uprawa in uprawy.items():
-                for i, zad in enumerate(uprawa['zadania']):
-                    if zad['data'] == context_day:
-                        zadania_do_usuniecia.append((uprawa_id, i, uprawa['nazwa'], zad['opis']))
+            zadania_do_usuniecia = [
+                (uprawa_id, i, uprawy[uprawa_id].nazwa, zad.opis, zad.id)
+                for uprawa_id, i, zad in indeks_dat.get(date.fromisoformat(context_day), [])
+            ]
             if zadania_do_usuniecia:
                 with st.form("remove_event_form_main"):
                     idx = st.selectbox("Wybierz zadanie do usunięcia:", list(range(len(zadania_do_usuniecia))), format_func=lambda i: f"{zadania_do_usuniecia[i][2]}: {zadania_do_usuniecia[i][3]}")
                     submitted = st.form_submit_button("Usuń")
                     if submitted:
-                        uprawa_id, i, _, _ = zadania_do_usuniecia[idx]
-                        del uprawy[uprawa_id]['zadania'][i]
-                        dodaj_uprawe_do_bazy(client, uprawa_id, uprawy[uprawa_id])
-                        st.success("Usunięto wydarzenie!")
-                        st.session_state['context_action'] = None
-                        st.session_state['context_day'] = None
-                        st.rerun()
+                        uprawa_id, i, _, _, zadanie_id = zadania_do_usuniecia[idx]
+                        if tryb_zadan():
+                            usun_zadanie_z_bazy(client, uprawa_id, zadanie_id)
+                            usuniete = True
+                        else:
+                            uprawa = uprawy[uprawa_id]
+                            usuniete = zapisz_zmiany_uprawy(client, uprawa_id, uprawa, uprawa.zadania, {'usuniete': [i]})
+                        if usuniete:
+                            st.success("Usunięto wydarzenie!")
+                            st.session_state['context_action'] = None
+                            st.session_state['context_day'] = None
+                            st.rerun()
             else:
                 st.info("Brak wydarzeń do usunięcia na ten dzień.")
                 st.session_state['context_action'] = None
@@ -677,7 +754,7 @@ if st.session_state['main_view'] == 'kalendarz':
             if selected_day:
                 data_selected = datetime.strptime(selected_day, '%Y-%m-%d').date()
                 st.subheader(f"Zadania na {data_selected.strftime('%d.%m.%Y')}")
-                zadania_selected = pobierz_zadania_na_dzien(data_selected, uprawy, wybrane_uprawy)
+                zadania_selected = pobierz_zadania_na_dzien(data_selected, indeks_dat, uprawy, wybrane_uprawy)
                 if zadania_selected:
                     for zadanie in zadania_selected:
                         st.info(f"**{zadanie['uprawa']}**: {zadanie['opis']}")
@@ -688,7 +765,7 @@ if st.session_state['main_view'] == 'kalendarz':
         with tab2:
             st.subheader("Dzisiaj")
             if uprawy:
-                zadania_dzis = pobierz_zadania_na_dzien(dzis, uprawy, wybrane_uprawy)
+                zadania_dzis = pobierz_zadania_na_dzien(dzis, indeks_dat, uprawy, wybrane_uprawy)
                 if zadania_dzis:
                     for zadanie in zadania_dzis:
                         st.info(f"**{zadanie['uprawa']}**: {zadanie['opis']}")
@@ -702,7 +779,7 @@ if st.session_state['main_view'] == 'kalendarz':
         if uprawy:
             jutro = dzis.date() + timedelta(days=1)
             za_tydzien = jutro + timedelta(days=7)
-            zadania_tydzien = pobierz_zadania_w_zakresie(jutro, za_tydzien, uprawy, wybrane_uprawy)
+            zadania_tydzien = pobierz_zadania_w_zakresie(jutro, za_tydzien, indeks_zakresow, uprawy, wybrane_uprawy)
             if zadania_tydzien:
                 for zadanie in zadania_tydzien:
                     st.info(f"**{zadanie['data'].strftime('%d.%m')}** - {zadanie['uprawa']}: {zadanie['opis']}")
@@ -719,20 +796,22 @@ if st.session_state['main_view'] == 'kalendarz':
             st.caption(f"📊 Liczba upraw w bazie: {len(uprawy)}")
         else:
             st.caption("📊 Baza danych jest pusta")
+elif st.session_state['main_view'] == 'przeglad':
+    st.header("Przegląd roku")
+    dzis = date.today()
+    rok_przegladu = st.selectbox("Rok:", range(dzis.year - 1, dzis.year + 3), index=1, key="rok_przegladu")
+    rysuj_przeglad_roku(pobierz_przeglad_roku(client, dane, rok_przegladu), uprawy, wybrane_uprawy)
 else:
     st.title("Zarządzaj uprawami")
     if not uprawy:
         st.info("Brak upraw w bazie.")
     else:
         uprawa_ids = list(uprawy.keys())
-        uprawa_nazwy = [uprawy[u]['nazwa'] for u in uprawa_ids]
+        uprawa_nazwy = [uprawy[u].nazwa for u in uprawa_ids]
         idx = st.selectbox("Wybierz uprawę do edycji:", range(len(uprawa_ids)), format_func=lambda i: uprawa_nazwy[i], key="select_uprawa_edit")
         uprawa_id = uprawa_ids[idx]
         uprawa = uprawy[uprawa_id]
 
-        # Edycja nazwy uprawy
-        new_nazwa = st.text_input("Nazwa uprawy:", value=uprawa['nazwa'], key=f"nazwa_{uprawa_id}")
-        # Edycja emoji koloru uprawy
         EMOJI_KOLORY = [
             ("🟩", "Zielony"),
             ("🟥", "Czerwony"),
@@ -745,38 +824,56 @@ else:
         ]
         emoji_values = [e[0] for e in EMOJI_KOLORY]
         emoji_dict = dict(EMOJI_KOLORY)
-        emoji_default = uprawa.get('emoji', '🟩')
-        new_emoji_val = st.selectbox(
-            "Kolor uprawy:",
-            options=emoji_values,
-            index=emoji_values.index(emoji_default) if emoji_default in emoji_values else 0,
-            format_func=lambda e: f"{e} {emoji_dict[e]}",
-            key=f"emoji_{uprawa_id}"
-        )
+        emoji_default = uprawa.emoji or '🟩'
+
+        # Zadania stronami - zmiany niezapisane przed zmianą strony są porzucane
+        zadania = pobierz_zadania_do_edycji(client, dane, uprawa_id)
+        liczba_stron = max(1, -(-len(zadania) // ROZMIAR_STRONY_EDYTORA))
+        strona = 1
+        if liczba_stron > 1:
+            strona = st.number_input(
+                f"Strona zadań (1-{liczba_stron}):", min_value=1, max_value=liczba_stron, value=1,
+                key=f"strona_{uprawa_id}"
+            )
+        od = (strona - 1) * ROZMIAR_STRONY_EDYTORA
+        # Wersja danych w kluczu: po zapisie edytor startuje od nowa
+        klucz_edytora = f"edytor_{uprawa_id}_{strona}_{dane['wersja']}"
+
+        with st.form(f"edycja_{uprawa_id}"):
+            # Edycja nazwy uprawy
+            new_nazwa = st.text_input("Nazwa uprawy:", value=uprawa.nazwa, key=f"nazwa_{uprawa_id}")
+            # Edycja emoji koloru uprawy
+            new_emoji_val = st.selectbox(
+                "Kolor uprawy:",
+                options=emoji_values,
+                index=emoji_values.index(emoji_default) if emoji_default in emoji_values else 0,
+                format_func=lambda e: f"{e} {emoji_dict[e]}",
+                key=f"emoji_{uprawa_id}"
+            )
 
-        # Edycja i usuwanie zadań
-        st.markdown("#### Zadania")
-        zadania = uprawa['zadania']
-        zadania_to_remove = []
-        for i, zad in enumerate(zadania):
-            col1, col2, col3, col4 = st.columns([2,4,2,1])
-            with col1:
-                new_data = st.date_input("Data", value=pd.to_datetime(zad['data']), key=f"data_{uprawa_id}_{i}")
-            with col2:
-                new_opis = st.text_input("Opis", value=zad['opis'], key=f"opis_{uprawa_id}_{i}")
-            with col3:
-                checked = zad.get('zrealizowane', False)
-                new_checked = st.checkbox("Zrealizowane?", value=checked, key=f"done_{uprawa_id}_{i}")
-            with col4:
-                if st.button("Usuń", key=f"del_{uprawa_id}_{i}"):
-                    zadania_to_remove.append(i)
-            # Aktualizuj zadanie jeśli zmieniono
-            zad['data'] = new_data.strftime('%Y-%m-%d')
-            zad['opis'] = new_opis
-            zad['zrealizowane'] = new_checked
-        # Usuwanie wybranych zadań
-        for i in sorted(zadania_to_remove, reverse=True):
-            del zadania[i]
+            # Edycja, dodawanie i usuwanie zadań
+            st.markdown("#### Zadania")
+            st.data_editor(
+                tabela_zadan(zadania, od, od + ROZMIAR_STRONY_EDYTORA),
+                key=klucz_edytora,
+                num_rows="dynamic",
+                hide_index=True,
+                width="stretch",
+                column_config={
+                    'data': st.column_config.DateColumn("Data", format="YYYY-MM-DD", required=True),
+                    'opis': st.column_config.TextColumn("Opis", required=True),
+                    'zrealizowane': st.column_config.CheckboxColumn("Zrealizowane?", default=False)
+                }
+            )
+            zapisz_btn = st.form_submit_button("Zapisz zmiany")
+
+        # Zapisz zmiany - tylko to, co zmieniono
+        if zapisz_btn:
+            zmiany = zmiany_z_edytora(st.session_state[klucz_edytora], od)
+            zmiany['uprawa'] = {'nazwa': new_nazwa, 'emoji': new_emoji_val}
+            if zapisz_zmiany_uprawy(client, uprawa_id, uprawa, zadania, zmiany):
+                st.success("Zapisano zmiany!")
+                st.rerun()
 
         # Dodawanie nowego zadania
         st.markdown("#### Dodaj nowe zadanie")
@@ -785,14 +882,6 @@ else:
             new_opis = st.text_input("Opis zadania", key=f"add_opis_{uprawa_id}")
             add_submit = st.form_submit_button("Dodaj zadanie")
             if add_submit and new_opis:
-                zadania.append({'data': new_data.strftime('%Y-%m-%d'), 'opis': new_opis, 'zrealizowane': False})
-                dodaj_uprawe_do_bazy(client, uprawa_id, {'nazwa': new_nazwa, 'zadania': zadania, 'emoji': new_emoji_val})
-                st.success("Dodano zadanie!")
-                st.rerun()
-
-        # Zapisz zmiany
-        if st.button("Zapisz zmiany", key=f"save_{uprawa_id}"):
-            # ZAWSZE zapisuj emoji!
-            dodaj_uprawe_do_bazy(client, uprawa_id, {'nazwa': new_nazwa, 'zadania': zadania, 'emoji': new_emoji_val})
-            st.success("Zapisano zmiany!")
-            st.rerun()
+                if dodaj_zadania_do_bazy(client, {uprawa_id: [Zadanie(new_data, new_opis)]}, uprawy):
+                    st.success("Dodano zadanie!")
+                    st.rerun()
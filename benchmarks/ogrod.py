@@ -0,0 +1,35 @@
+# Syntetyczny ogród do pomiarów: zadany rozmiar (uprawy, zadania, lata) i
+# ziarno losowania, więc ten sam zestaw parametrów daje te same dane.
+import random
+from datetime import date, timedelta
+
+from ogrodniczka.model import Uprawa, Zadanie
+
+EMOJI = ['🍅', '🥕', '🥒', '🧅', '🥬', '🌶️', '🫑', '🥔', '🌽', '🍓', None]
+CZYNNOSCI = [
+    'Wysiew nasion na rozsadę', 'Wysiew do gruntu', 'Pikowanie', 'Hartowanie rozsady',
+    'Przesadzanie do gruntu', 'Podlewanie', 'Nawożenie', 'Pielenie', 'Ściółkowanie', 'Zbiór'
+]
+
+# Zadania rozkładane są równo między uprawy, a daty losowo w latach
+# rok_poczatkowy .. rok_poczatkowy + lata - 1; zadania uprawy posortowane po dacie
+def syntetyczny_ogrod(liczba_upraw, liczba_zadan, lata=1, rok_poczatkowy=2026, ziarno=0):
+    losowanie = random.Random(ziarno)
+    poczatek = date(rok_poczatkowy, 1, 1)
+    dni = (date(rok_poczatkowy + lata, 1, 1) - poczatek).days
+    uprawy = {}
+    for i in range(liczba_upraw):
+        liczba = liczba_zadan // liczba_upraw + (i < liczba_zadan % liczba_upraw)
+        zadania = sorted(
+            (
+                Zadanie(
+                    poczatek + timedelta(days=losowanie.randrange(dni)),
+                    f"{losowanie.choice(CZYNNOSCI)} ({j + 1})",
+                    losowanie.random() < 0.3
+                )
+                for j in range(liczba)
+            ),
+            key=lambda zadanie: zadanie.data
+        )
+        uprawy[f"uprawa_{i}"] = Uprawa(f"Uprawa {i}", zadania, EMOJI[i % len(EMOJI)])
+    return uprawy
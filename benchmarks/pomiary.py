@@ -0,0 +1,231 @@
+# Pomiary wydajności: zapytania kalendarza na indeksach w pamięci, siatka
+# miesiąca (emoji upraw dla każdego dnia) oraz zapis i wczytanie ogrodu w
+# lokalnym Qdrant w pamięci. Wynik w JSON do porównania między commitami:
+#   python -m benchmarks.pomiary --wyjscie przed.json
+#   python -m benchmarks.porownaj przed.json po.json
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from datetime import date, datetime, timedelta
+from importlib import metadata
+
+from ogrodniczka import konfiguracja
+from ogrodniczka.baza import (
+    DOMYSLNE_SZABLONY, polacz, przygotuj_kolekcje, tryb_zadan, zapisz_uprawy_do_bazy, zapisz_zmiany_uprawy,
+    dodaj_zadania_do_bazy, usun_uprawe_z_bazy, pobierz_uprawy_z_bazy, pobierz_zadania_w_oknach
+)
+from ogrodniczka.indeks import (
+    zbuduj_indeks_dat, zbuduj_indeks_zakresow, pobierz_zadania_na_dzien, pobierz_zadania_w_zakresie,
+    pobierz_zadania_do_edycji, zbuduj_siatke_miesiaca
+)
+from ogrodniczka.model import Zadanie
+
+from benchmarks.ogrod import syntetyczny_ogrod
+
+# Czas funkcji w kolejnych powtórzeniach. przygotuj() (poza pomiarem) zwraca
+# argumenty dla funkcji; wywolania to liczba zapytań w jednym powtórzeniu, a
+# wynik (np. liczba znalezionych zadań) pozwala sprawdzić, że porównujemy to samo.
+# Funkcje bez przygotuj() tylko czytają, więc pierwsze wywołanie jest rozgrzewką.
+def pomiar(funkcja, powtorzenia, wywolania=1, przygotuj=None):
+    if przygotuj is None:
+        funkcja()
+    czasy = []
+    for _ in range(powtorzenia):
+        argumenty = przygotuj() if przygotuj else ()
+        start = time.perf_counter()
+        wynik = funkcja(*argumenty)
+        czasy.append(time.perf_counter() - start)
+    mediana = statistics.median(czasy)
+    return {
+        'mediana_s': mediana,
+        'min_s': min(czasy),
+        'powtorzenia': powtorzenia,
+        'wywolania': wywolania,
+        'mediana_na_wywolanie_us': mediana / wywolania * 1e6,
+        'wynik': wynik
+    }
+
+# Okna dat widoków: kolejne tygodnie, miesiące i lata od 1 stycznia
+def okna_dat(rok, lata):
+    koniec = date(rok + lata, 1, 1)
+    tygodnie = [
+        (dzien, min(dzien + timedelta(days=6), koniec - timedelta(days=1)))
+        for dzien in (date(rok, 1, 1) + timedelta(days=7 * i) for i in range(((koniec - date(rok, 1, 1)).days + 6) // 7))
+    ]
+    miesiace = [
+        (date(r, m, 1), (date(r + m // 12, m % 12 + 1, 1) - timedelta(days=1)))
+        for r in range(rok, rok + lata) for m in range(1, 13)
+    ]
+    return {
+        'tydzien': tygodnie,
+        'miesiac': miesiace,
+        'rok': [(date(r, 1, 1), date(r, 12, 31)) for r in range(rok, rok + lata)]
+    }
+
+def pomiary_zapytan(uprawy, rok, lata, powtorzenia):
+    wybrane = list(uprawy)
+    wyniki = {
+        'budowa_indeksow': pomiar(
+            lambda: len(zbuduj_indeks_zakresow(zbuduj_indeks_dat(uprawy))['dni']), powtorzenia
+        )
+    }
+    indeks_dat = zbuduj_indeks_dat(uprawy)
+    indeks_zakresow = zbuduj_indeks_zakresow(indeks_dat)
+
+    dni = [date(rok, 1, 1) + timedelta(days=i) for i in range((date(rok + lata, 1, 1) - date(rok, 1, 1)).days)]
+    wyniki['zadania_na_dzien'] = pomiar(
+        lambda: sum(len(pobierz_zadania_na_dzien(dzien, indeks_dat, uprawy, wybrane)) for dzien in dni),
+        powtorzenia, len(dni)
+    )
+    for nazwa, okna in okna_dat(rok, lata).items():
+        wyniki[f'zadania_w_zakresie_{nazwa}'] = pomiar(
+            lambda okna=okna: sum(
+                len(pobierz_zadania_w_zakresie(od, do, indeks_zakresow, uprawy, wybrane)) for od, do in okna
+            ),
+            powtorzenia, len(okna)
+        )
+    miesiace = [(r, m) for r in range(rok, rok + lata) for m in range(1, 13)]
+    wyniki['siatka_miesiaca'] = pomiar(
+        lambda: sum(
+            len(zbuduj_siatke_miesiaca(r, m, indeks_dat, uprawy, wybrane)['legenda']) for r, m in miesiace
+        ),
+        powtorzenia, len(miesiace)
+    )
+    return wyniki
+
+# Nowa kolekcja w Qdrant w pamięci, bez domyślnych upraw
+def pusta_baza():
+    client = polacz()
+    przygotuj_kolekcje(client)
+    for uprawa_id in DOMYSLNE_SZABLONY:
+        usun_uprawe_z_bazy(client, uprawa_id)
+    return client
+
+def pomiary_bazy(uprawy, rok, powtorzenia):
+    klienci = []
+
+    def nowa_baza():
+        klienci.append(pusta_baza())
+        return (klienci[-1],)
+
+    wyniki = {
+        'zapis_ogrodu': pomiar(
+            lambda client: zapisz_uprawy_do_bazy(client, uprawy) or len(uprawy), powtorzenia, przygotuj=nowa_baza
+        )
+    }
+    client = klienci.pop()
+    for stary in klienci:
+        stary.close()
+
+    wyniki['wczytanie_upraw'] = pomiar(lambda: len(pobierz_uprawy_z_bazy(client)), powtorzenia)
+    if tryb_zadan():
+        # W trybie "zadania" widok miesiąca pobiera zadania z okna dat
+        maj = [(date(rok, 5, 1), date(rok, 5, 31))]
+        wyniki['zadania_w_oknie_miesiaca'] = pomiar(
+            lambda: sum(1 for _ in pobierz_zadania_w_oknach(client, maj)), powtorzenia
+        )
+
+    uprawa_id = next((uprawa_id for uprawa_id, uprawa in uprawy.items() if uprawa.zadania), None)
+    if uprawa_id is not None:
+        def wczytaj_uprawe():
+            wczytane = pobierz_uprawy_z_bazy(client)
+            return wczytane[uprawa_id], pobierz_zadania_do_edycji(client, {'uprawy': wczytane}, uprawa_id)
+
+        def zmien_status(uprawa, zadania):
+            zmiany = {'zmienione': {0: {'zrealizowane': not zadania[0].zrealizowane}}}
+            zapisz_zmiany_uprawy(client, uprawa_id, uprawa, zadania, zmiany)
+            return 1
+
+        def dodaj_zadanie(uprawa, zadania):
+            dodaj_zadania_do_bazy(client, {uprawa_id: [Zadanie(date(rok, 6, 1), "Nowe zadanie")]}, {uprawa_id: uprawa})
+            return 1
+
+        wyniki['zmiana_zadania'] = pomiar(zmien_status, powtorzenia, przygotuj=wczytaj_uprawe)
+        wyniki['dodanie_zadania'] = pomiar(dodaj_zadanie, powtorzenia, przygotuj=wczytaj_uprawe)
+    client.close()
+    return wyniki
+
+def _wersja(pakiet):
+    try:
+        return metadata.version(pakiet)
+    except metadata.PackageNotFoundError:
+        return None
+
+def srodowisko():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'czas': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platforma': platform.platform(),
+        'biblioteki': {pakiet: _wersja(pakiet) for pakiet in ["numpy", "pandas", "qdrant-client"]}
+    }
+
+def parser_pomiarow():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.pomiary", description="Pomiary wydajności kalendarza")
+    parser.add_argument("--zadania", type=int, nargs="+", default=[10, 1000, 100000], help="liczby zadań w ogrodzie")
+    parser.add_argument("--uprawy", type=int, default=20, help="liczba upraw")
+    parser.add_argument("--lata", type=int, default=1, help="liczba lat, na które rozkładane są zadania")
+    parser.add_argument("--rok", type=int, default=2026, help="pierwszy rok ogrodu")
+    parser.add_argument("--ziarno", type=int, default=0, help="ziarno generatora danych")
+    parser.add_argument("--powtorzenia", type=int, default=5, help="powtórzenia każdego pomiaru")
+    parser.add_argument(
+        "--tryb", choices=["uprawy", "zadania"], nargs="+", default=["uprawy", "zadania"],
+        help="tryby przechowywania dla pomiarów bazy"
+    )
+    # Lokalny Qdrant przewija kolekcję liniowo dla każdej strony, więc w
+    # trybie "zadania" (punkt na zadanie) duże ogrody mierzyłyby głównie to
+    parser.add_argument(
+        "--limit-bazy", type=int, default=20000,
+        help="najwięcej zadań dla pomiarów bazy w trybie 'zadania' (0 - pomiń bazę)"
+    )
+    parser.add_argument("--wyjscie", default="-", help="plik wynikowy JSON ('-' - stdout)")
+    return parser
+
+def main(argv=None):
+    args = parser_pomiarow().parse_args(argv)
+    warnings.filterwarnings("ignore", message="Payload indexes have no effect")
+    wyniki = []
+    for liczba_zadan in args.zadania:
+        liczba_upraw = max(1, min(args.uprawy, liczba_zadan))
+        print(f"⏱️ {liczba_zadan} zadań, {liczba_upraw} upraw, lata: {args.lata}", file=sys.stderr)
+        uprawy = syntetyczny_ogrod(liczba_upraw, liczba_zadan, args.lata, args.rok, args.ziarno)
+        wynik = {
+            'zadania': liczba_zadan,
+            'uprawy': liczba_upraw,
+            'lata': args.lata,
+            'zapytania': pomiary_zapytan(uprawy, args.rok, args.lata, args.powtorzenia),
+            'baza': {}
+        }
+        for tryb in args.tryb:
+            if args.limit_bazy == 0:
+                wynik['baza'][tryb] = {'pominieto': "--limit-bazy 0"}
+                continue
+            if tryb == "zadania" and liczba_zadan > args.limit_bazy:
+                wynik['baza'][tryb] = {'pominieto': f"ponad limit {args.limit_bazy} zadań (--limit-bazy)"}
+                continue
+            konfiguracja.tryb_przechowywania = tryb
+            wynik['baza'][tryb] = pomiary_bazy(uprawy, args.rok, args.powtorzenia)
+        wyniki.append(wynik)
+
+    raport = {'srodowisko': srodowisko(), 'parametry': vars(args), 'wyniki': wyniki}
+    if args.wyjscie == "-":
+        json.dump(raport, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        with open(args.wyjscie, "w", encoding="utf-8") as plik:
+            json.dump(raport, plik, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
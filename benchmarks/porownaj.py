@@ -0,0 +1,44 @@
+# Porównanie dwóch raportów z benchmarks.pomiary: stosunek median dla
+# każdego pomiaru; kod wyjścia 1, jeśli któryś zwolnił ponad próg.
+import argparse
+import json
+import sys
+
+# Mediany z raportu: (zadania, uprawy, lata, grupa, pomiar) -> sekundy
+def mediany(raport):
+    wyniki = {}
+    for wynik in raport['wyniki']:
+        rozmiar = (wynik['zadania'], wynik['uprawy'], wynik['lata'])
+        grupy = {'zapytania': wynik['zapytania']}
+        grupy.update({f"baza/{tryb}": pomiary for tryb, pomiary in wynik['baza'].items()})
+        for grupa, pomiary in grupy.items():
+            for nazwa, pomiar in pomiary.items():
+                if isinstance(pomiar, dict):
+                    wyniki[(*rozmiar, grupa, nazwa)] = pomiar['mediana_s']
+    return wyniki
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.porownaj", description="Porównanie raportów pomiarów")
+    parser.add_argument("przed", help="raport JSON bazowy")
+    parser.add_argument("po", help="raport JSON po zmianie")
+    parser.add_argument("--prog", type=float, default=1.2, help="stosunek median uznawany za regresję")
+    args = parser.parse_args(argv)
+    with open(args.przed, encoding="utf-8") as plik:
+        przed = mediany(json.load(plik))
+    with open(args.po, encoding="utf-8") as plik:
+        po = mediany(json.load(plik))
+
+    regresje = 0
+    for klucz in sorted(przed.keys() & po.keys()):
+        zadania, uprawy, lata, grupa, nazwa = klucz
+        stosunek = po[klucz] / przed[klucz] if przed[klucz] else float('inf')
+        znak = "⚠️" if stosunek > args.prog else "  "
+        regresje += stosunek > args.prog
+        print(
+            f"{znak} {zadania:>7} zad. {uprawy:>4} upr. {lata} l.  {grupa:<14} {nazwa:<26}"
+            f" {przed[klucz] * 1e3:10.3f} ms -> {po[klucz] * 1e3:10.3f} ms  x{stosunek:.2f}"
+        )
+    return 1 if regresje else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
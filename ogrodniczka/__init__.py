@@ -0,0 +1,3 @@
+# Rdzeń kalendarza ogrodnika bez Streamlit: model, baza Qdrant, indeksy dat,
+# generowanie kalendarzy, wyszukiwanie, kopie zapasowe i eksport .ics.
+# Interfejs Streamlit (app.py) i CLI (python -m ogrodniczka) korzystają z modułów.
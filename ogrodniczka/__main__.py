@@ -0,0 +1,5 @@
+import sys
+
+from ogrodniczka.cli import main
+
+sys.exit(main())
@@ -0,0 +1,627 @@
+# Przechowywanie upraw, zadań i ustawień w Qdrant: zapis paczkami, zapis
+# przyrostowy, odczyt stronami, schemat z migracjami i domyślne uprawy
+import json
+import time
+import uuid
+from dataclasses import replace
+from datetime import date
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import Filter, FieldCondition, MatchValue, MatchAny, PointIdsList, FilterSelector
+from qdrant_client.models import HasIdCondition, IsEmptyCondition, PayloadField, DatetimeRange
+from qdrant_client.models import UpsertOperation, DeleteOperation, PointsList
+from qdrant_client.models import SetPayloadOperation, SetPayload
+from qdrant_client.models import PayloadSchemaType
+
+from ogrodniczka import konfiguracja
+from ogrodniczka.model import Uprawa, Zadanie, _pola_payloadu
+from ogrodniczka.szablony import szablon_z_terminow, utworz_szablon, instancjonuj_szablon
+
+# Klient Qdrant: serwer (url), lokalny katalog (path) albo pamięć procesu, gdy
+# nie podano żadnego. Tryb lokalny qdrant-client ma to samo API co serwer, a
+# utworzenie klienta nie łączy się jeszcze z siecią.
+def polacz(url=None, path=None, api_key=None):
+    if url:
+        return QdrantClient(url=url, api_key=api_key)
+    if path:
+        return QdrantClient(path=path)
+    return QdrantClient(location=":memory:")
+
+# Domyślne uprawy dodawane do nowej kolekcji, jako szablony (miesiąc, dzień, opis)
+# tworzone na bieżący rok
+DOMYSLNE_SZABLONY = {
+    'pomidory': ('Pomidory', [
+        (3, 15, 'Wysiew nasion na rozsadę'),
+        (5, 15, 'Przesadzanie rozsady do gruntu'),
+        (6, 1, 'Podlewanie i nawożenie'),
+        (7, 1, 'Zbieranie pierwszych owoców'),
+        (8, 15, 'Regularne zbieranie owoców')
+    ]),
+    'marchew': ('Marchew', [
+        (4, 1, 'Wysiew nasion do gruntu'),
+        (5, 1, 'Przerzedzanie siewek'),
+        (6, 15, 'Regularne podlewanie'),
+        (9, 1, 'Zbieranie marchewki')
+    ]),
+    'ogorki': ('Ogórki', [
+        (4, 15, 'Wysiew nasion na rozsadę'),
+        (5, 20, 'Przesadzanie do gruntu'),
+        (6, 10, 'Podpieranie roślin'),
+        (7, 15, 'Zbieranie owoców')
+    ])
+}
+
+# Inicjalizacja kolekcji i schematu. Wersja schematu jest zapisana w punkcie
+# metadanych, więc przy starcie procesu wykonywane są tylko brakujące migracje.
+# Zwraca (nazwa kolekcji, komunikaty dla użytkownika).
+def przygotuj_kolekcje(client):
+    collection_name = "kalendarz_ogrodnika"
+    komunikaty = []
+
+    # Sprawdź czy kolekcja istnieje
+    collection_exists = client.collection_exists(collection_name)
+    if not collection_exists:
+        # Utwórz kolekcję
+        client.create_collection(
+            collection_name=collection_name,
+            vectors_config=VectorParams(size=1, distance=Distance.COSINE),
+            optimizers_config=None,
+            on_disk_payload=True
+        )
+        komunikaty.append("Utworzono nową kolekcję")
+
+    wersja = pobierz_wersje_schematu(client)
+    for wersja_migracji, opis, migracja in MIGRACJE:
+        if wersja_migracji > wersja:
+            migracja(client)
+            zapisz_wersje_schematu(client, wersja_migracji)
+            if collection_exists:
+                komunikaty.append(f"Migracja schematu {wersja_migracji}: {opis}")
+
+    if tryb_zadan():
+        przeniesione = migruj_do_punktow_zadan(client)
+        if przeniesione:
+            komunikaty.append(f"Przeniesiono {przeniesione} zadań do osobnych punktów")
+
+    # Dodaj domyślne uprawy tylko dla nowej kolekcji
+    if not collection_exists:
+        rok = date.today().year
+        zapisz_uprawy_do_bazy(client, {
+            uprawa_id: instancjonuj_szablon(szablon_z_terminow(nazwa, terminy), rok)
+            for uprawa_id, (nazwa, terminy) in DOMYSLNE_SZABLONY.items()
+        })
+        komunikaty.append("Dodano domyślne uprawy")
+
+    return collection_name, komunikaty
+
+# Funkcje do operacji na bazie danych
+
+# Rozmiar strony przy przewijaniu kolekcji, liczba punktów w jednym żądaniu
+# zapisu i pola payloadu potrzebne do widoków
+ROZMIAR_STRONY = 256
+ROZMIAR_PACZKI = 256
+POLA_UPRAWY = ["uprawa_id", "nazwa", "zadania", "emoji", "zaktualizowano"]
+POLA_ZADANIA = ["uprawa_id", "data", "opis", "zrealizowane"]
+
+# Stała przestrzeń nazw dla deterministycznych identyfikatorów punktów
+NAMESPACE_OGRODNICZKA = uuid.uuid5(uuid.NAMESPACE_URL, "ogrodniczka/kalendarz_ogrodnika")
+
+def id_punktu_uprawy(uprawa_id):
+    # Każda uprawa ma zawsze ten sam punkt, więc zapis nadpisuje poprzednią wersję
+    return str(uuid.uuid5(NAMESPACE_OGRODNICZKA, f"uprawa:{uprawa_id}"))
+
+def _klucz_wersji(point):
+    # Nowsza wersja uprawy: punkt o stałym ID, a w dalszej kolejności najpóźniejszy zapis
+    payload = point.payload
+    return (str(point.id) == id_punktu_uprawy(payload['uprawa_id']), payload.get('zaktualizowano', 0))
+
+def _filtr_typu(typ):
+    return Filter(must=[FieldCondition(key="type", match=MatchValue(value=typ))])
+
+# Generator punktów danego typu (lub spełniających filtr) - podąża za
+# next_page_offset, więc zwraca wszystkie punkty, a nie tylko pierwszą stronę
+def iteruj_punkty(client, typ, pola=True, rozmiar_strony=ROZMIAR_STRONY, collection_name="kalendarz_ogrodnika"):
+    filtr = _filtr_typu(typ) if isinstance(typ, str) else typ
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=filtr,
+            limit=rozmiar_strony,
+            offset=offset,
+            with_payload=pola,
+            with_vectors=False
+        )
+        yield from points
+        if offset is None:
+            return
+
+# Tryb przechowywania zadań: "uprawy" (domyślny) trzyma listę zadań w payloadzie
+# uprawy, "zadania" zapisuje każde zadanie jako osobny punkt z indeksowaną datą,
+# dzięki czemu widoki pobierają z bazy tylko zadania z wyświetlanych dni.
+def tryb_zadan():
+    return konfiguracja.tryb_przechowywania == "zadania"
+
+def _filtr_zadan_uprawy(uprawa_id):
+    return Filter(must=[
+        FieldCondition(key="type", match=MatchValue(value="zadanie")),
+        FieldCondition(key="uprawa_id", match=MatchValue(value=uprawa_id))
+    ])
+
+def _punkt_zadania(uprawa_id, zadanie):
+    return PointStruct(
+        id=zadanie.id or str(uuid.uuid4()),
+        vector=[1.0],
+        payload={"type": "zadanie", "uprawa_id": uprawa_id, **zadanie.payload()}
+    )
+
+def _zadanie_z_punktu(point):
+    return Zadanie.z_payloadu(point.payload, str(point.id))
+
+def _punkt_uprawy(uprawa_id, uprawa, z_zadaniami=True):
+    payload = {
+        "type": "uprawa",
+        "uprawa_id": uprawa_id,
+        **uprawa.payload(z_zadaniami),
+        "zaktualizowano": time.time()
+    }
+    return PointStruct(
+        id=id_punktu_uprawy(uprawa_id),
+        vector=[1.0],  # Dummy vector
+        payload=payload
+    )
+
+# Wysyła operacje zapisu paczkami: każde żądanie batch_update_points zawiera
+# co najwyżej ROZMIAR_PACZKI punktów, więc N upraw to zwykle jedno żądanie.
+# Przy czekaj=False serwer potwierdza przyjęcie bez czekania na zapis.
+def wyslij_operacje(client, operacje, czekaj=True, collection_name="kalendarz_ogrodnika"):
+    paczka, punkty_w_paczce = [], 0
+    for operacja in operacje:
+        if isinstance(operacja, UpsertOperation):
+            punkty = operacja.upsert.points
+            for i in range(0, len(punkty), ROZMIAR_PACZKI):
+                kawalek = punkty[i:i + ROZMIAR_PACZKI]
+                if paczka and punkty_w_paczce + len(kawalek) > ROZMIAR_PACZKI:
+                    client.batch_update_points(collection_name=collection_name, update_operations=paczka, wait=czekaj)
+                    paczka, punkty_w_paczce = [], 0
+                paczka.append(UpsertOperation(upsert=PointsList(points=kawalek)))
+                punkty_w_paczce += len(kawalek)
+        else:
+            paczka.append(operacja)
+    if paczka:
+        client.batch_update_points(collection_name=collection_name, update_operations=paczka, wait=czekaj)
+
+def _operacje_upraw(uprawy):
+    if not tryb_zadan():
+        points = [_punkt_uprawy(uprawa_id, uprawa) for uprawa_id, uprawa in uprawy.items()]
+        return [UpsertOperation(upsert=PointsList(points=points))]
+
+    # Uprawa bez zadań + osobny punkt dla każdego zadania. Punkt uprawy idzie
+    # za swoimi zadaniami, żeby przerwany zapis nie zostawił uprawy bez zadań.
+    points, usuniecia = [], []
+    for uprawa_id, uprawa in uprawy.items():
+        zadania = [zadanie if zadanie.id else replace(zadanie, id=str(uuid.uuid4())) for zadanie in uprawa.zadania]
+        points += [_punkt_zadania(uprawa_id, zadanie) for zadanie in zadania]
+        points.append(_punkt_uprawy(uprawa_id, uprawa, z_zadaniami=False))
+        # Usuń punkty zadań, których nie ma już w uprawie
+        filtr = _filtr_zadan_uprawy(uprawa_id)
+        filtr.must_not = [HasIdCondition(has_id=[zadanie.id for zadanie in zadania])]
+        usuniecia.append(DeleteOperation(delete=FilterSelector(filter=filtr)))
+    return [UpsertOperation(upsert=PointsList(points=points))] + usuniecia
+
+# Zapis wielu upraw naraz (seedowanie, import, generowanie wielu upraw)
+def zapisz_uprawy_do_bazy(client, uprawy, czekaj=True):
+    if not uprawy:
+        return
+    wyslij_operacje(client, _operacje_upraw(uprawy), czekaj)
+    konfiguracja.po_zapisie()
+
+def dodaj_uprawe_do_bazy(client, uprawa_id, uprawa):
+    zapisz_uprawy_do_bazy(client, {uprawa_id: uprawa})
+
+# --- Zapis przyrostowy ---
+# Zmiany uprawy względem wczytanej listy zadań:
+# {'uprawa': {pole: wartość}, 'zmienione': {nr zadania: {pole: wartość}},
+#  'dodane': [zadania], 'usuniete': [nr zadań]} (wszystkie klucze opcjonalne).
+# Do bazy trafiają tylko pola, które faktycznie się zmieniły: set_payload na
+# punktach zadań (tryb "zadania") albo na elementach "zadania[i]" punktu
+# uprawy. Dodanie lub usunięcie zadania w trybie "uprawy" nadpisuje samo pole
+# "zadania" - Qdrant nie ma operacji dopisania do listy.
+def _tylko_zmienione(pola, obecne):
+    return {pole: wartosc for pole, wartosc in pola.items() if getattr(obecne, pole) != wartosc}
+
+def _operacje_zmian(uprawa_id, uprawa, zadania, zmiany):
+    usuniete = set(zmiany.get('usuniete', []))
+    zmienione = {}
+    for i, pola in zmiany.get('zmienione', {}).items():
+        pola = _tylko_zmienione(pola, zadania[i])
+        if pola and i not in usuniete:
+            zmienione[i] = pola
+    dodane = zmiany.get('dodane', [])
+    pola_uprawy = _tylko_zmienione(zmiany.get('uprawa', {}), uprawa)
+    if not (zmienione or dodane or usuniete or pola_uprawy):
+        return []
+
+    operacje = []
+    punkt_uprawy = id_punktu_uprawy(uprawa_id)
+    pola_uprawy['zaktualizowano'] = time.time()
+    if tryb_zadan():
+        # Zadania z takimi samymi zmianami (np. oznaczenie kilku jako
+        # zrealizowane) idą jedną operacją
+        grupy = {}
+        for i, pola in zmienione.items():
+            grupy.setdefault(json.dumps(_pola_payloadu(pola), sort_keys=True), []).append(zadania[i].id)
+        for pola, ids in grupy.items():
+            operacje.append(SetPayloadOperation(set_payload=SetPayload(payload=json.loads(pola), points=ids)))
+        if dodane:
+            points = [_punkt_zadania(uprawa_id, zadanie) for zadanie in dodane]
+            operacje.append(UpsertOperation(upsert=PointsList(points=points)))
+        if usuniete:
+            operacje.append(DeleteOperation(delete=PointIdsList(points=[zadania[i].id for i in sorted(usuniete)])))
+    elif dodane or usuniete or uprawa.pominiete:
+        # Bez pominiętych zadań pozycje i w pamięci i w payloadzie są te same;
+        # w przeciwnym razie lista jest zapisywana od nowa
+        nowe_zadania = [
+            replace(zadanie, **zmienione.get(i, {})) for i, zadanie in enumerate(zadania) if i not in usuniete
+        ] + dodane
+        nowe_zadania.sort(key=lambda zadanie: zadanie.data)
+        pola_uprawy['zadania'] = [zadanie.payload() for zadanie in nowe_zadania]
+    else:
+        for i, pola in zmienione.items():
+            operacje.append(SetPayloadOperation(
+                set_payload=SetPayload(payload=_pola_payloadu(pola), points=[punkt_uprawy], key=f"zadania[{i}]")
+            ))
+    # Punkt uprawy na końcu, za swoimi zadaniami
+    operacje.append(SetPayloadOperation(set_payload=SetPayload(payload=_pola_payloadu(pola_uprawy), points=[punkt_uprawy])))
+    return operacje
+
+# W trybie "uprawy" zadania są adresowane pozycją na liście w payloadzie. Jeśli
+# od wczytania uprawę zapisała inna sesja (inne 'zaktualizowano'), pozycje mogły
+# się przesunąć - zmiany są wtedy przenoszone na aktualną listę z bazy, a
+# zadania odszukiwane po treści. Gdy któregoś już nie ma: ValueError. Qdrant nie
+# ma zapisu warunkowego, więc zostaje tylko okno między odczytem a zapisem.
+def _zmiany_na_aktualnej_liscie(client, uprawa_id, uprawa, zadania, zmiany):
+    points = client.retrieve(
+        collection_name="kalendarz_ogrodnika",
+        ids=[id_punktu_uprawy(uprawa_id)],
+        with_payload=POLA_UPRAWY,
+        with_vectors=False
+    )
+    if not points:
+        raise ValueError(f"Uprawa {uprawa.nazwa} została usunięta w innej sesji")
+    aktualna = Uprawa.z_payloadu(points[0].payload)
+    if aktualna.zaktualizowano == uprawa.zaktualizowano:
+        return uprawa, zadania, zmiany
+
+    wolne = {}
+    for j, zadanie in enumerate(aktualna.zadania):
+        wolne.setdefault((zadanie.data, zadanie.opis, zadanie.zrealizowane), []).append(j)
+    pozycje = {}
+    for i in sorted(set(zmiany.get('zmienione', {})) | set(zmiany.get('usuniete', []))):
+        zadanie = zadania[i]
+        kandydaci = wolne.get((zadanie.data, zadanie.opis, zadanie.zrealizowane))
+        if not kandydaci:
+            raise ValueError(f"Zadanie \"{zadanie.opis}\" zostało zmienione lub usunięte w innej sesji")
+        pozycje[i] = kandydaci.pop(0)
+    przeniesione = dict(zmiany)
+    if 'zmienione' in zmiany:
+        przeniesione['zmienione'] = {pozycje[i]: pola for i, pola in zmiany['zmienione'].items()}
+    if 'usuniete' in zmiany:
+        przeniesione['usuniete'] = [pozycje[i] for i in zmiany['usuniete']]
+    return aktualna, aktualna.zadania, przeniesione
+
+# Zwraca False, gdy zmian nie dało się zapisać (uprawa zmieniona w innej sesji);
+# dane są wtedy unieważniane, żeby widok pokazał aktualny stan
+def zapisz_zmiany_uprawy(client, uprawa_id, uprawa, zadania, zmiany):
+    try:
+        if not tryb_zadan():
+            uprawa, zadania, zmiany = _zmiany_na_aktualnej_liscie(client, uprawa_id, uprawa, zadania, zmiany)
+    except ValueError as e:
+        konfiguracja.zglos('error', f"Nie zapisano zmian: {e}. Odśwież widok i spróbuj ponownie.")
+        konfiguracja.po_zapisie()
+        return False
+    operacje = _operacje_zmian(uprawa_id, uprawa, zadania, zmiany)
+    if operacje:
+        wyslij_operacje(client, operacje)
+        konfiguracja.po_zapisie()
+    return True
+
+# Dopisanie zadań {uprawa_id: [zadania]} do istniejących upraw jednym zapisem
+def dodaj_zadania_do_bazy(client, nowe_zadania, uprawy):
+    operacje = []
+    for uprawa_id, zadania in nowe_zadania.items():
+        uprawa, obecne, zmiany = uprawy[uprawa_id], uprawy[uprawa_id].zadania, {'dodane': zadania}
+        if not tryb_zadan():
+            try:
+                uprawa, obecne, zmiany = _zmiany_na_aktualnej_liscie(client, uprawa_id, uprawa, obecne, zmiany)
+            except ValueError as e:
+                konfiguracja.zglos('error', f"Nie dodano zadań: {e}. Odśwież widok i spróbuj ponownie.")
+                konfiguracja.po_zapisie()
+                return False
+        operacje += _operacje_zmian(uprawa_id, uprawa, obecne, zmiany)
+    if operacje:
+        wyslij_operacje(client, operacje)
+        konfiguracja.po_zapisie()
+    return True
+
+def usun_zadanie_z_bazy(client, uprawa_id, zadanie_id):
+    # Razem z nową wersją uprawy, tak jak każda inna zmiana jej zadań
+    wyslij_operacje(client, [
+        DeleteOperation(delete=PointIdsList(points=[zadanie_id])),
+        SetPayloadOperation(set_payload=SetPayload(
+            payload={"zaktualizowano": time.time()}, points=[id_punktu_uprawy(uprawa_id)]
+        ))
+    ])
+    konfiguracja.po_zapisie()
+
+def pobierz_zadania_uprawy(client, uprawa_id):
+    zadania = [
+        _zadanie_z_punktu(point)
+        for point in iteruj_punkty(client, _filtr_zadan_uprawy(uprawa_id), POLA_ZADANIA)
+    ]
+    return sorted(zadania, key=lambda zadanie: zadanie.data)
+
+# Zadania ze wszystkich upraw z podanych okien dat [(od, do), ...], filtrowane
+# po stronie serwera na indeksie datetime pola 'data'
+def pobierz_zadania_w_oknach(client, okna):
+    filtr = Filter(
+        must=[FieldCondition(key="type", match=MatchValue(value="zadanie"))],
+        should=[FieldCondition(key="data", range=DatetimeRange(gte=od, lte=do)) for od, do in okna]
+    )
+    for point in iteruj_punkty(client, filtr, POLA_ZADANIA):
+        yield point.payload['uprawa_id'], _zadanie_z_punktu(point)
+
+def pobierz_uprawy_z_bazy(client, rozmiar_strony=ROZMIAR_STRONY):
+    try:
+        # Pobierz wszystkie uprawy, strona po stronie, tylko potrzebne pola
+        uprawy = {}
+        wersje = {}
+        for point in iteruj_punkty(client, "uprawa", POLA_UPRAWY, rozmiar_strony):
+            payload = point.payload
+            uprawa_id = payload['uprawa_id']
+            # Do czasu kompaktacji mogą istnieć duplikaty - bierzemy najnowszy
+            wersja = _klucz_wersji(point)
+            if uprawa_id in wersje and wersje[uprawa_id] > wersja:
+                continue
+            wersje[uprawa_id] = wersja
+            # W trybie "zadania" payload nie ma listy zadań - są osobnymi punktami
+            uprawy[uprawa_id] = Uprawa.z_payloadu(payload)
+        return uprawy
+    except Exception as e:
+        konfiguracja.zglos('error', f"Błąd pobierania upraw z bazy: {e}")
+        return {}
+
+# Jednorazowa kompaktacja: dla każdej uprawy zostaje tylko najnowsza wersja,
+# zapisana pod stałym ID. Starsze kopie (z losowym uuid4) są usuwane.
+def kompaktuj_uprawy(client):
+    collection_name = "kalendarz_ogrodnika"
+    najnowsze = {}
+    wszystkie_id = []
+    for point in iteruj_punkty(client, "uprawa"):
+        wszystkie_id.append(str(point.id))
+        uprawa_id = point.payload['uprawa_id']
+        obecny = najnowsze.get(uprawa_id)
+        # Przy równych wersjach (stare punkty bez znacznika czasu) wygrywa
+        # ostatni zwrócony punkt, tak jak dotychczas przy odczycie
+        if obecny is None or _klucz_wersji(point) >= _klucz_wersji(obecny):
+            najnowsze[uprawa_id] = point
+
+    zachowane = set()
+    do_zapisu = []
+    for uprawa_id, point in najnowsze.items():
+        stale_id = id_punktu_uprawy(uprawa_id)
+        zachowane.add(stale_id)
+        if str(point.id) != stale_id:
+            do_zapisu.append(PointStruct(id=stale_id, vector=[1.0], payload=point.payload))
+    if do_zapisu:
+        client.upsert(collection_name=collection_name, points=do_zapisu)
+
+    do_usuniecia = [point_id for point_id in wszystkie_id if point_id not in zachowane]
+    if do_usuniecia:
+        client.delete(collection_name=collection_name, points_selector=PointIdsList(points=do_usuniecia))
+    return len(do_usuniecia)
+
+# --- Schemat i migracje ---
+# Każda migracja ma numer wersji; nowe indeksy lub zmiany układu danych
+# dopisujemy na końcu listy MIGRACJE.
+def id_punktu_schematu():
+    return str(uuid.uuid5(NAMESPACE_OGRODNICZKA, "schemat"))
+
+def pobierz_wersje_schematu(client):
+    collection_name = "kalendarz_ogrodnika"
+    points = client.retrieve(
+        collection_name=collection_name,
+        ids=[id_punktu_schematu()],
+        with_payload=["wersja"],
+        with_vectors=False
+    )
+    if points:
+        return points[0].payload.get('wersja', 0)
+    return 0
+
+def zapisz_wersje_schematu(client, wersja):
+    collection_name = "kalendarz_ogrodnika"
+    point = PointStruct(
+        id=id_punktu_schematu(),
+        vector=[1.0],
+        payload={
+            "type": "schemat",
+            "wersja": wersja,
+            "zaktualizowano": time.time()
+        }
+    )
+    client.upsert(collection_name=collection_name, points=[point])
+
+def _utworz_indeks(client, pole, typ):
+    collection_name = "kalendarz_ogrodnika"
+    try:
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=pole,
+            field_schema=typ
+        )
+    except Exception as e:
+        # Kolekcje sprzed wersjonowania schematu mogą już mieć ten indeks
+        if "already exists" not in str(e).lower():
+            raise
+
+def migracja_indeksy_podstawowe(client):
+    _utworz_indeks(client, "type", PayloadSchemaType.KEYWORD)
+    _utworz_indeks(client, "uprawa_id", PayloadSchemaType.KEYWORD)
+
+def migracja_indeks_daty(client):
+    _utworz_indeks(client, "data", PayloadSchemaType.DATETIME)
+
+# Stare wersje zapisywały ustawienia pod losowym ID - przenosimy je pod stałe ID
+def migracja_ustawienia_stale_id(client):
+    collection_name = "kalendarz_ogrodnika"
+    points, _ = client.scroll(
+        collection_name=collection_name,
+        scroll_filter=_filtr_typu("ustawienia"),
+        limit=1,
+        with_payload=["wybrane_uprawy"],
+        with_vectors=False
+    )
+    operacje = [DeleteOperation(delete=FilterSelector(filter=_filtr_typu("ustawienia")))]
+    if points:
+        operacje += _operacje_ustawien(points[0].payload.get('wybrane_uprawy', []))
+    wyslij_operacje(client, operacje)
+
+MIGRACJE = [
+    (1, "indeksy pól 'type' i 'uprawa_id'", migracja_indeksy_podstawowe),
+    (2, "kompaktacja zduplikowanych upraw", kompaktuj_uprawy),
+    (3, "indeks datetime pola 'data' zadań", migracja_indeks_daty),
+    (4, "ustawienia pod stałym ID", migracja_ustawienia_stale_id),
+]
+
+# Przeniesienie zadań z payloadu upraw do osobnych punktów (tryb "zadania").
+# Dotyka tylko upraw, które wciąż mają niepustą listę zadań, więc kolejne
+# uruchomienia są tanie. ID zadań są deterministyczne, więc przerwaną
+# migrację można bezpiecznie powtórzyć.
+def migruj_do_punktow_zadan(client):
+    collection_name = "kalendarz_ogrodnika"
+    filtr = _filtr_typu("uprawa")
+    filtr.must_not = [IsEmptyCondition(is_empty=PayloadField(key="zadania"))]
+    przeniesione = 0
+    while True:
+        points, _ = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=filtr,
+            limit=ROZMIAR_STRONY,
+            with_vectors=False
+        )
+        if not points:
+            return przeniesione
+        uprawy = {}
+        for point in points:
+            uprawa_id = point.payload['uprawa_id']
+            uprawa = Uprawa.z_payloadu(point.payload)
+            uprawa.zadania = [
+                replace(zadanie, id=str(uuid.uuid5(NAMESPACE_OGRODNICZKA, f"zadanie:{uprawa_id}:{i}")))
+                for i, zadanie in enumerate(uprawa.zadania)
+            ]
+            # Nadpisanie uprawy już bez listy zadań kończy migrację tej uprawy
+            uprawy[uprawa_id] = uprawa
+            przeniesione += len(uprawa.zadania)
+        zapisz_uprawy_do_bazy(client, uprawy)
+
+# Ustawienia są jednym punktem o stałym ID: zapis to pojedynczy upsert, a czytelnik
+# nigdy nie trafia na moment, w którym ustawień nie ma
+def id_punktu_ustawien():
+    return str(uuid.uuid5(NAMESPACE_OGRODNICZKA, "ustawienia"))
+
+# Zwraca None, jeśli ustawień jeszcze nie zapisano (a [] gdy nic nie wybrano).
+# Błąd odczytu nie jest zamieniany na None - wywołujący nadpisałby wtedy
+# zapisany wybór domyślnym.
+def pobierz_wybrane_uprawy_z_bazy(client):
+    collection_name = "kalendarz_ogrodnika"
+    # Pobierz ustawienia wybranych upraw
+    points = client.retrieve(
+        collection_name=collection_name,
+        ids=[id_punktu_ustawien()],
+        with_payload=["wybrane_uprawy"],
+        with_vectors=False
+    )
+    if points:
+        return points[0].payload.get('wybrane_uprawy', [])
+    else:
+        return None
+
+def _operacje_ustawien(wybrane_uprawy):
+    point = PointStruct(
+        id=id_punktu_ustawien(),
+        vector=[1.0],
+        payload={
+            "type": "ustawienia",
+            "wybrane_uprawy": wybrane_uprawy
+        }
+    )
+    return [UpsertOperation(upsert=PointsList(points=[point]))]
+
+def zapisz_wybrane_uprawy_do_bazy(client, wybrane_uprawy):
+    wyslij_operacje(client, _operacje_ustawien(wybrane_uprawy))
+
+# Usunięcie uprawy; jeśli podano nową listę wybranych upraw, zapisujemy ją
+# w tym samym żądaniu
+def usun_uprawe_z_bazy(client, uprawa_id, wybrane_uprawy=None):
+    operacje = [DeleteOperation(delete=FilterSelector(filter=Filter(must=[
+        # Razem z uprawą usuwamy jej punkty zadań (tryb "zadania")
+        FieldCondition(key="type", match=MatchAny(any=["uprawa", "zadanie"])),
+        FieldCondition(key="uprawa_id", match=MatchValue(value=uprawa_id))
+    ])))]
+    if wybrane_uprawy is not None:
+        operacje += _operacje_ustawien(wybrane_uprawy)
+    try:
+        wyslij_operacje(client, operacje)
+        konfiguracja.po_zapisie()
+    except Exception as e:
+        konfiguracja.zglos('error', f"Błąd usuwania uprawy: {e}")
+
+# Sezon zadania, tak jak przesunięcia lat w szablonach: sezon zaczyna się w dniu
+# roku pierwszego zadania uprawy, a wcześniejsze dni roku należą jeszcze do
+# sezonu poprzedniego (np. styczniowe okrywanie czosnku posadzonego w październiku)
+def _sezon(poczatek, data):
+    if (data.month, data.day) < (poczatek.month, poczatek.day):
+        return data.year - 1
+    return data.year
+
+# Przeniesienie ogrodu na kolejny sezon: zadania wybranych upraw z sezonu
+# źródłowego są zamieniane na szablony i tworzone w sezonie docelowym (bez
+# zadań, które już tam są). Wszystko trafia do bazy jednym zapisem.
+def przenies_ogrod_na_rok(client, uprawy, wybrane_uprawy, rok_zrodlowy, rok_docelowy):
+    zadania_upraw = {uprawa_id: [] for uprawa_id in wybrane_uprawy if uprawa_id in uprawy}
+    if tryb_zadan() and zadania_upraw:
+        # Początek sezonu wyznacza pierwsze zadanie uprawy, więc potrzebne są
+        # wszystkie jej zadania, a nie tylko okno roku źródłowego
+        filtr = Filter(must=[
+            FieldCondition(key="type", match=MatchValue(value="zadanie")),
+            FieldCondition(key="uprawa_id", match=MatchAny(any=list(zadania_upraw)))
+        ])
+        for point in iteruj_punkty(client, filtr, POLA_ZADANIA):
+            zadania_upraw[point.payload['uprawa_id']].append(_zadanie_z_punktu(point))
+    else:
+        for uprawa_id in zadania_upraw:
+            zadania_upraw[uprawa_id] = uprawy[uprawa_id].zadania
+
+    nowe_zadania = {}
+    for uprawa_id, zadania in zadania_upraw.items():
+        if not zadania:
+            continue
+        poczatek = min(zadanie.data for zadanie in zadania)
+        zrodlowe = [zadanie for zadanie in zadania if _sezon(poczatek, zadanie.data) == rok_zrodlowy]
+        if not zrodlowe:
+            continue
+        istniejace = {(zadanie.data, zadanie.opis) for zadanie in zadania}
+        # Przesunięcie całego sezonu o tyle samo lat - prace z kolejnego roku
+        # (np. zimowe) zostają w kolejnym roku sezonu docelowego
+        pierwszy_rok = min(zadanie.data.year for zadanie in zrodlowe)
+        kalendarz = instancjonuj_szablon(
+            utworz_szablon(uprawy[uprawa_id].nazwa, zrodlowe), pierwszy_rok + rok_docelowy - rok_zrodlowy
+        )
+        nowe = [zadanie for zadanie in kalendarz.zadania if (zadanie.data, zadanie.opis) not in istniejace]
+        if nowe:
+            nowe_zadania[uprawa_id] = nowe
+    if nowe_zadania:
+        dodaj_zadania_do_bazy(client, nowe_zadania, uprawy)
+    return sum(len(zadania) for zadania in nowe_zadania.values())
@@ -0,0 +1,146 @@
+# Wiersz poleceń: python -m ogrodniczka <polecenie>. Połączenie jak w UI:
+# QDRANT_URL / QDRANT_PATH, QDRANT_API_KEY, TRYB_PRZECHOWYWANIA i
+# OPENAI_API_KEY ze zmiennych środowiskowych albo opcji. W przeciwieństwie do
+# UI nie ma bazy w pamięci - dane z CLI znikałyby razem z procesem.
+import argparse
+import logging
+import os
+import sys
+from datetime import date, timedelta
+
+from ogrodniczka import konfiguracja
+from ogrodniczka.baza import polacz, przygotuj_kolekcje, zapisz_uprawy_do_bazy, zapisz_wybrane_uprawy_do_bazy
+from ogrodniczka.indeks import wczytaj_dane, pobierz_indeksy, pobierz_zadania_w_zakresie
+from ogrodniczka.model import utworz_uprawa_id
+
+# Format pliku z opcji albo z rozszerzenia; '-' to stdin/stdout
+def _format_pliku(sciezka, format):
+    if format:
+        return format
+    if sciezka == '-':
+        return 'ndjson'
+    rozszerzenie = sciezka.rsplit('.', 1)[-1].lower()
+    return 'ndjson' if rozszerzenie == 'jsonl' else rozszerzenie
+
+# Pliki zawsze binarnie: kodowanie i końce linii (CRLF w .ics) ustalają formaty,
+# a nie locale ani system
+def _otworz(sciezka, tryb):
+    if sciezka == '-':
+        return open((sys.stdin if 'r' in tryb else sys.stdout).fileno(), tryb, closefd=False)
+    return open(sciezka, tryb)
+
+# Wybrane uprawy z bazy (wszystkie, jeśli ustawień jeszcze nie zapisano)
+def _wybrane(dane):
+    if dane['wybrane_uprawy'] is None:
+        return list(dane['uprawy'])
+    return dane['wybrane_uprawy']
+
+# Dopisanie nowych upraw do zapisanych wybranych, tak jak w UI
+def _dopisz_do_wybranych(client, dane, nowe):
+    wybrane = _wybrane(dane)
+    zapisz_wybrane_uprawy_do_bazy(client, wybrane + [uprawa_id for uprawa_id in nowe if uprawa_id not in wybrane])
+
+def polecenie_zadania(client, args):
+    dane = wczytaj_dane(client)
+    od = args.od or date.today()
+    do = od + timedelta(days=args.dni - 1)
+    _, indeks_zakresow = pobierz_indeksy(client, dane, [(od, do)])
+    wybrane = list(dane['uprawy']) if args.wszystkie else _wybrane(dane)
+    for zadanie in pobierz_zadania_w_zakresie(od, do, indeks_zakresow, dane['uprawy'], wybrane):
+        print(f"{zadanie['data']}  {zadanie['uprawa']}: {zadanie['opis']}")
+
+def polecenie_eksport(client, args):
+    # Import leniwy: pandas/pyarrow są potrzebne tylko przy kopiach
+    from ogrodniczka.kopie import eksportuj_kopie
+    with _otworz(args.plik, 'wb') as plik:
+        eksportuj_kopie(client, plik, _format_pliku(args.plik, args.format))
+
+def polecenie_import(client, args):
+    from ogrodniczka.kopie import rekordy_z_pliku, importuj_kopie
+    with _otworz(args.plik, 'rb') as plik:
+        zaimportowane, liczba_zadan, wybrane_z_kopii = importuj_kopie(
+            client, rekordy_z_pliku(plik, _format_pliku(args.plik, args.format))
+        )
+    _dopisz_do_wybranych(client, wczytaj_dane(client), wybrane_z_kopii if wybrane_z_kopii is not None else zaimportowane)
+    print(f"Zaimportowano uprawy: {len(zaimportowane)}, zadania: {liczba_zadan}")
+
+def polecenie_generuj(client, args):
+    from openai import OpenAI
+    from ogrodniczka.generowanie import wygeneruj_wiele_kalendarzy
+    if not args.openai_api_key:
+        raise ValueError("brak klucza API OpenAI (OPENAI_API_KEY)")
+
+    def pokaz_postep(nazwa, kalendarz, blad):
+        if blad is None:
+            print(f"✅ {nazwa}: {len(kalendarz.zadania)} zadań")
+        else:
+            print(f"❌ {nazwa}: {blad}", file=sys.stderr)
+
+    kalendarze, _ = wygeneruj_wiele_kalendarzy(
+        client, OpenAI(api_key=args.openai_api_key), args.nazwy, args.rok, pokaz_postep
+    )
+    if kalendarze:
+        nowe_uprawy = {utworz_uprawa_id(nazwa): kalendarz for nazwa, kalendarz in kalendarze.items()}
+        zapisz_uprawy_do_bazy(client, nowe_uprawy)
+        _dopisz_do_wybranych(client, wczytaj_dane(client), list(nowe_uprawy))
+
+def polecenie_ics(client, args):
+    from ogrodniczka.ics import kalendarz_ics
+    dane = wczytaj_dane(client)
+    with _otworz(args.plik, 'wb') as plik:
+        plik.write(kalendarz_ics(client, dane['uprawy'], _wybrane(dane)).encode('utf-8'))
+
+def parser_polecen():
+    parser = argparse.ArgumentParser(prog="python -m ogrodniczka", description="Kalendarz ogrodnika bez interfejsu")
+    parser.add_argument("--url", default=os.environ.get("QDRANT_URL"), help="adres serwera Qdrant")
+    parser.add_argument("--path", default=os.environ.get("QDRANT_PATH"), help="katalog lokalnej bazy Qdrant")
+    parser.add_argument("--api-key", default=os.environ.get("QDRANT_API_KEY"), help="klucz API Qdrant")
+    parser.add_argument(
+        "--tryb", choices=["uprawy", "zadania"], default=konfiguracja.tryb_przechowywania,
+        help="tryb przechowywania zadań"
+    )
+    polecenia = parser.add_subparsers(dest="polecenie", required=True)
+
+    zadania = polecenia.add_parser("zadania", help="zadania wybranych upraw w najbliższych dniach")
+    zadania.add_argument("--od", type=date.fromisoformat, help="pierwszy dzień (RRRR-MM-DD), domyślnie dziś")
+    zadania.add_argument("--dni", type=int, default=7, help="liczba dni (domyślnie 7)")
+    zadania.add_argument("--wszystkie", action="store_true", help="wszystkie uprawy zamiast wybranych")
+    zadania.set_defaults(funkcja=polecenie_zadania)
+
+    for nazwa, opis, funkcja in [
+        ("eksport", "kopia całej kolekcji do pliku", polecenie_eksport),
+        ("import", "import kopii z pliku", polecenie_import)
+    ]:
+        kopia = polecenia.add_parser(nazwa, help=opis)
+        kopia.add_argument("plik", help="ścieżka pliku lub '-' dla stdout/stdin")
+        kopia.add_argument("--format", choices=["ndjson", "csv", "parquet"], help="domyślnie z rozszerzenia")
+        kopia.set_defaults(funkcja=funkcja)
+
+    generuj = polecenia.add_parser("generuj", help="kalendarze upraw z OpenAI (z pamięcią podręczną szablonów)")
+    generuj.add_argument("nazwy", nargs="+", help="nazwy roślin")
+    generuj.add_argument("--rok", type=int, default=date.today().year, help="rok uprawy")
+    generuj.add_argument("--openai-api-key", default=os.environ.get("OPENAI_API_KEY"), help="klucz API OpenAI")
+    generuj.set_defaults(funkcja=polecenie_generuj)
+
+    ics = polecenia.add_parser("ics", help="kalendarz .ics wybranych upraw")
+    ics.add_argument("plik", help="ścieżka pliku lub '-' dla stdout")
+    ics.set_defaults(funkcja=polecenie_ics)
+    return parser
+
+def main(argv=None):
+    parser = parser_polecen()
+    args = parser.parse_args(argv)
+    if not args.url and not args.path:
+        parser.error("podaj bazę: --url albo --path (lub QDRANT_URL / QDRANT_PATH)")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    konfiguracja.tryb_przechowywania = args.tryb
+    client = polacz(url=args.url, path=args.path, api_key=args.api_key)
+    try:
+        przygotuj_kolekcje(client)
+        args.funkcja(client, args)
+    except ValueError as e:
+        print(f"Błąd: {e}", file=sys.stderr)
+        return 1
+    finally:
+        client.close()
+    return 0
@@ -0,0 +1,543 @@
+# Generowanie kalendarzy upraw przez OpenAI: prompt ze schematem JSON,
+# walidacja i lokalna naprawa odpowiedzi, strumieniowanie, równoległe
+# generowanie wielu upraw i pamięć podręczna szablonów w Qdrant
+import calendar
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+
+import openai
+from qdrant_client.models import PointStruct, PointIdsList, UpsertOperation, PointsList
+
+from ogrodniczka import konfiguracja
+from ogrodniczka.baza import NAMESPACE_OGRODNICZKA, iteruj_punkty, wyslij_operacje, _filtr_typu
+from ogrodniczka.model import Uprawa, utworz_uprawa_id
+from ogrodniczka.szablony import utworz_szablon, instancjonuj_szablon
+
+# Funkcja agenta OpenAI do generowania kalendarza upraw
+def _prompt_kalendarza(nazwa_uprawy, rok, przyklady=None):
+    prompt = f"""
+    Jesteś ekspertem ogrodnikiem. Przygotuj kompletny kalendarz upraw dla rośliny: {nazwa_uprawy} na rok {rok}.
+    
+    Zwróć odpowiedź w formacie JSON z następującą strukturą:
+    {{
+        "nazwa": "Nazwa rośliny",
+        "zadania": [
+            {{
+                "data": "YYYY-MM-DD",
+                "opis": "Opis zadania"
+            }}
+        ]
+    }}
+    
+    Uwzględnij wszystkie kluczowe etapy uprawy:
+    - Przygotowanie ziemi/podłoża
+    - Wysiew nasion lub sadzenie rozsady
+    - Pielęgnację (podlewanie, nawożenie, odchwaszczanie)
+    - Formowanie (przycinanie, podpieranie)
+    - Zbiór i przechowywanie
+    - Przygotowanie do zimy (jeśli dotyczy)
+    
+    Uwzględnij klimat umiarkowany (Polska) i podaj realistyczne daty dla każdego zadania.
+    Prace przypadające na początek kolejnego roku (np. zimowe) mogą mieć datę z roku {rok + 1}.
+    Każde zadanie powinno mieć konkretny, praktyczny opis.
+    
+    Zwróć tylko JSON, bez dodatkowych komentarzy.
+    """
+    if przyklady:
+        # Kalendarze podobnych upraw z ogrodu jako przykłady (few-shot)
+        prompt += f"""
+    Dla spójności terminów i stylu opisów - kalendarze podobnych upraw z tego ogrodu:
+    {json.dumps(przyklady, ensure_ascii=False)}
+    """
+    return prompt
+
+# Structured outputs: model musi zwrócić JSON zgodny z tym schematem, więc nie
+# ma odpowiedzi, których nie da się sparsować. Wymaga modelu obsługującego
+# response_format typu json_schema.
+MODEL_AI = "gpt-4o-mini"
+SCHEMAT_KALENDARZA = {
+    "type": "object",
+    "properties": {
+        "nazwa": {"type": "string"},
+        "zadania": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "data": {"type": "string", "description": "Data w formacie YYYY-MM-DD"},
+                    "opis": {"type": "string"}
+                },
+                "required": ["data", "opis"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["nazwa", "zadania"],
+    "additionalProperties": False
+}
+
+def _parametry_zapytania(nazwa_uprawy, rok, przyklady=None):
+    return {
+        "model": MODEL_AI,
+        "messages": [
+            {"role": "system", "content": "Jesteś ekspertem ogrodnikiem i zwracasz odpowiedzi wyłącznie w formacie JSON."},
+            {"role": "user", "content": _prompt_kalendarza(nazwa_uprawy, rok, przyklady)}
+        ],
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": "kalendarz_upraw", "strict": True, "schema": SCHEMAT_KALENDARZA}
+        },
+        "temperature": 0.7,
+        "max_tokens": 1500
+    }
+
+# Walidacja kalendarza przed zapisem. Poprawne strukturalnie odpowiedzi ze złymi
+# datami są naprawiane lokalnie zamiast generowania od nowa: inne formaty dat są
+# zamieniane na YYYY-MM-DD, brakujący rok albo rok spoza żądanego i następnego
+# (prace zimowe po jesiennym sadzeniu) ustawiany na żądany, nieistniejące dni
+# (np. 31 kwietnia) przesuwane na koniec miesiąca, a duplikaty usuwane.
+# Zwraca (kalendarz, lista poprawek); ValueError, gdy nie ma żadnego zadania.
+WZORZEC_DATY = re.compile(r'^\s*(\d{1,4})[-./](\d{1,2})(?:[-./](\d{1,4}))?')
+
+def _napraw_date(tekst, rok):
+    dopasowanie = WZORZEC_DATY.match(str(tekst))
+    if not dopasowanie:
+        return None
+    a, miesiac, b = dopasowanie.groups()
+    # YYYY-MM-DD, DD.MM.YYYY albo DD.MM (bez roku)
+    if len(a) >= 3:
+        if b is None:
+            return None
+        rok_daty, dzien = int(a), int(b)
+    else:
+        rok_daty, dzien = (int(b) if b and len(b) >= 3 else None), int(a)
+    if rok_daty not in (rok, rok + 1):
+        rok_daty = rok
+    miesiac = int(miesiac)
+    if not 1 <= miesiac <= 12 or dzien < 1:
+        return None
+    dzien = min(dzien, calendar.monthrange(rok_daty, miesiac)[1])
+    return date(rok_daty, miesiac, dzien).isoformat()
+
+def waliduj_kalendarz(kalendarz, rok, nazwa_uprawy=None):
+    poprawki = []
+    nazwa = kalendarz.get('nazwa') if isinstance(kalendarz, dict) else None
+    if not isinstance(nazwa, str) or not nazwa.strip():
+        nazwa = nazwa_uprawy
+    zadania = kalendarz.get('zadania') if isinstance(kalendarz, dict) else None
+    if not isinstance(zadania, list):
+        raise ValueError("odpowiedź bez listy zadań")
+
+    poprawione, widziane = [], set()
+    for zadanie in zadania:
+        if not isinstance(zadanie, dict) or not str(zadanie.get('opis', '')).strip():
+            poprawki.append("pominięto zadanie bez opisu")
+            continue
+        opis = str(zadanie['opis']).strip()
+        data = _napraw_date(zadanie.get('data', ''), rok)
+        if data is None:
+            poprawki.append(f"pominięto zadanie z niepoprawną datą: {zadanie.get('data')!r}")
+            continue
+        if data != zadanie.get('data'):
+            poprawki.append(f"poprawiono datę {zadanie.get('data')!r} na {data}")
+        klucz = (data, opis.lower())
+        if klucz in widziane:
+            poprawki.append(f"usunięto duplikat: {data} {opis}")
+            continue
+        widziane.add(klucz)
+        poprawione.append({'data': data, 'opis': opis})
+
+    if not poprawione:
+        raise ValueError("odpowiedź nie zawiera poprawnych zadań")
+    poprawione.sort(key=lambda zadanie: zadanie['data'])
+    return {'nazwa': nazwa, 'zadania': poprawione}, poprawki
+
+# Zapytanie do OpenAI bez elementów interfejsu - zgłasza wyjątek przy błędzie,
+# więc można je wywoływać także z wątków roboczych
+def zapytaj_o_kalendarz(client_openai, nazwa_uprawy, rok, przyklady=None):
+    response = client_openai.chat.completions.create(**_parametry_zapytania(nazwa_uprawy, rok, przyklady))
+
+    # Parsuj odpowiedź JSON
+    response_text = response.choices[0].message.content.strip()
+
+    # Usuń potencjalne markdown formatting
+    if response_text.startswith("```json"):
+        response_text = response_text[7:-3]
+    elif response_text.startswith("```"):
+        response_text = response_text[3:-3]
+
+    kalendarz, _ = waliduj_kalendarz(json.loads(response_text), rok, nazwa_uprawy)
+    return kalendarz
+
+def wygeneruj_kalendarz_upraw(client_openai, nazwa_uprawy, rok=2025, przyklady=None):
+    if not client_openai:
+        return None
+
+    try:
+        return zapytaj_o_kalendarz(client_openai, nazwa_uprawy, rok, przyklady)
+    except Exception as e:
+        konfiguracja.zglos('error', f"Błąd generowania kalendarza: {e}")
+        return None
+
+# --- Generowanie strumieniowe ---
+# Parser przyrostowy: z kolejnych fragmentów odpowiedzi wyciąga obiekty zadań
+# z tablicy "zadania", gdy tylko zostaną w całości odebrane. Ucięta odpowiedź
+# zostawia więc wszystkie zadania odebrane do tego momentu.
+WZORZEC_ZADAN = re.compile(r'"zadania"\s*:\s*\[')
+WZORZEC_NAZWY = re.compile(r'"nazwa"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+class ParserZadan:
+    def __init__(self):
+        self.bufor = ""
+        self.pozycja = None
+        self.nazwa = None
+        self.zadania = []
+        self.zakonczony = False
+        self.dekoder = json.JSONDecoder()
+
+    def dodaj(self, fragment):
+        self.bufor += fragment
+        if self.nazwa is None:
+            dopasowanie = WZORZEC_NAZWY.search(self.bufor)
+            if dopasowanie:
+                self.nazwa = json.loads(dopasowanie.group(1))
+        if self.pozycja is None:
+            dopasowanie = WZORZEC_ZADAN.search(self.bufor)
+            if not dopasowanie:
+                return []
+            self.pozycja = dopasowanie.end()
+
+        nowe = []
+        while not self.zakonczony:
+            # Pomiń separatory między obiektami
+            while self.pozycja < len(self.bufor) and self.bufor[self.pozycja] in " \t\r\n,":
+                self.pozycja += 1
+            if self.pozycja >= len(self.bufor):
+                break
+            if self.bufor[self.pozycja] == "]":
+                self.zakonczony = True
+                break
+            try:
+                zadanie, self.pozycja = self.dekoder.raw_decode(self.bufor, self.pozycja)
+            except json.JSONDecodeError:
+                # Obiekt jeszcze niekompletny - czekamy na kolejny fragment
+                break
+            if isinstance(zadanie, dict) and 'data' in zadanie and 'opis' in zadanie:
+                self.zadania.append(zadanie)
+                nowe.append(zadanie)
+        return nowe
+
+def zapytaj_o_kalendarz_strumieniowo(client_openai, nazwa_uprawy, rok, parser, na_zadanie, przyklady=None):
+    stream = client_openai.chat.completions.create(**_parametry_zapytania(nazwa_uprawy, rok, przyklady), stream=True)
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        fragment = chunk.choices[0].delta.content
+        if fragment:
+            for zadanie in parser.dodaj(fragment):
+                na_zadanie(zadanie)
+
+# Zwraca (kalendarz, kompletny). Przy przerwanej lub uciętej odpowiedzi
+# kalendarz zawiera zadania odebrane do tej pory, a kompletny=False.
+def wygeneruj_kalendarz_strumieniowo(client_openai, nazwa_uprawy, rok, na_zadanie, przyklady=None):
+    if not client_openai:
+        return None, False
+
+    parser = ParserZadan()
+    kompletny = True
+    try:
+        zapytaj_o_kalendarz_strumieniowo(client_openai, nazwa_uprawy, rok, parser, na_zadanie, przyklady)
+        if parser.zadania and not parser.zakonczony:
+            konfiguracja.zglos('warning', f"Odpowiedź została ucięta - zachowano {len(parser.zadania)} zadań")
+            kompletny = False
+    except Exception as e:
+        if not parser.zadania:
+            konfiguracja.zglos('error', f"Błąd generowania kalendarza: {e}")
+            return None, False
+        konfiguracja.zglos('warning', f"Generowanie przerwane ({e}) - zachowano {len(parser.zadania)} zadań")
+        kompletny = False
+
+    try:
+        kalendarz, poprawki = waliduj_kalendarz(
+            {'nazwa': parser.nazwa, 'zadania': parser.zadania}, rok, nazwa_uprawy
+        )
+    except ValueError as e:
+        konfiguracja.zglos('error', f"Błąd generowania kalendarza: {e}")
+        return None, False
+    if poprawki:
+        konfiguracja.zglos('info', f"🔧 Poprawiono lokalnie {len(poprawki)} zadań (daty, duplikaty)")
+    return kalendarz, kompletny
+
+# --- Generowanie wielu kalendarzy naraz ---
+# Zapytania idą równolegle przez pulę AI_ROWNOLEGLOSC wątków, nie częściej niż
+# AI_ZAPYTAN_NA_MINUTE, a błędy przejściowe (limit, sieć, błąd serwera) są
+# ponawiane z wykładniczo rosnącym opóźnieniem. Odpowiedzi niepoprawne
+# merytorycznie nie są ponawiane - naprawia je waliduj_kalendarz. Własne
+# ponowienia klienta OpenAI są wtedy wyłączone, żeby każda próba przechodziła
+# przez ogranicznik i nie mnożyła się z AI_PROBY.
+AI_ROWNOLEGLOSC = 4
+AI_ZAPYTAN_NA_MINUTE = 60
+AI_PROBY = 4
+AI_OPOZNIENIE_PONOWIENIA = 1.0
+
+class OgranicznikZapytan:
+    # Rozkłada starty zapytań równomiernie w czasie (wspólny dla wszystkich wątków)
+    def __init__(self, na_minute):
+        self.odstep = 60.0 / na_minute
+        self.nastepny = time.monotonic()
+        self.blokada = threading.Lock()
+
+    def czekaj(self):
+        with self.blokada:
+            teraz = time.monotonic()
+            start = max(teraz, self.nastepny)
+            self.nastepny = start + self.odstep
+        time.sleep(max(0.0, start - teraz))
+
+BLEDY_PRZEJSCIOWE = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError
+)
+
+def zapytaj_o_kalendarz_z_ponowieniami(client_openai, nazwa_uprawy, rok, ogranicznik, przyklady=None):
+    for proba in range(AI_PROBY):
+        ogranicznik.czekaj()
+        try:
+            return zapytaj_o_kalendarz(client_openai, nazwa_uprawy, rok, przyklady)
+        except BLEDY_PRZEJSCIOWE:
+            if proba == AI_PROBY - 1:
+                raise
+            time.sleep(AI_OPOZNIENIE_PONOWIENIA * 2 ** proba + random.uniform(0, AI_OPOZNIENIE_PONOWIENIA))
+
+# --- Pamięć podręczna szablonów AI ---
+# Wygenerowane kalendarze są zapisywane w kolekcji jako szablony (type=ai_cache)
+# pod ID wyliczonym z wersji promptu i znormalizowanej nazwy, więc są wspólne
+# dla wszystkich użytkowników i wszystkich lat - kalendarz na inny rok powstaje
+# lokalnie z szablonu. Kalendarze wygenerowane z przykładami z ogrodu mają w
+# kluczu odcisk tych przykładów i nie trafiają pod klucz wspólny. Wpisy starsze
+# niż AI_CACHE_TTL są pomijane, a po przekroczeniu AI_CACHE_MAX usuwane są
+# najdawniej używane.
+PROMPT_WERSJA = 4
+AI_CACHE_TTL = 90 * 24 * 3600
+AI_CACHE_MAX = 500
+
+def klucz_szablonu_ai(nazwa_uprawy, odcisk_przykladow=None):
+    nazwa = utworz_uprawa_id(' '.join(nazwa_uprawy.split()))
+    if odcisk_przykladow:
+        return f"v{PROMPT_WERSJA}:{nazwa}:{odcisk_przykladow}"
+    return f"v{PROMPT_WERSJA}:{nazwa}"
+
+def _id_punktu_cache(klucz):
+    return str(uuid.uuid5(NAMESPACE_OGRODNICZKA, f"ai_cache:{klucz}"))
+
+# Wiele kluczy jednym zapytaniem; zwraca {klucz: szablon} tylko dla trafień
+def pobierz_szablony_ai_z_cache(client, klucze):
+    collection_name = "kalendarz_ogrodnika"
+    klucze_po_id = {_id_punktu_cache(klucz): klucz for klucz in klucze}
+    points = client.retrieve(
+        collection_name=collection_name,
+        ids=list(klucze_po_id),
+        with_payload=["szablon", "utworzono"],
+        with_vectors=False
+    )
+    teraz = time.time()
+    trafienia = [point for point in points if teraz - point.payload.get('utworzono', 0) <= AI_CACHE_TTL]
+    if trafienia:
+        # Odnotuj użycie dla usuwania najdawniej używanych wpisów, bez czekania na zapis
+        client.set_payload(
+            collection_name=collection_name,
+            payload={"ostatnie_uzycie": teraz},
+            points=[point.id for point in trafienia],
+            wait=False
+        )
+    return {klucze_po_id[str(point.id)]: point.payload['szablon'] for point in trafienia}
+
+def pobierz_szablon_ai_z_cache(client, klucz):
+    return pobierz_szablony_ai_z_cache(client, [klucz]).get(klucz)
+
+def zapisz_szablony_ai_do_cache(client, szablony):
+    teraz = time.time()
+    points = [
+        PointStruct(
+            id=_id_punktu_cache(klucz),
+            vector=[1.0],
+            payload={
+                "type": "ai_cache",
+                "klucz": klucz,
+                "szablon": szablon,
+                "utworzono": teraz,
+                "ostatnie_uzycie": teraz
+            }
+        )
+        for klucz, szablon in szablony.items()
+    ]
+    wyslij_operacje(client, [UpsertOperation(upsert=PointsList(points=points))])
+    przytnij_cache_ai(client)
+
+def zapisz_szablon_ai_do_cache(client, klucz, szablon):
+    zapisz_szablony_ai_do_cache(client, {klucz: szablon})
+
+def przytnij_cache_ai(client):
+    collection_name = "kalendarz_ogrodnika"
+    liczba = client.count(collection_name=collection_name, count_filter=_filtr_typu("ai_cache"), exact=True).count
+    if liczba <= AI_CACHE_MAX:
+        return
+    wpisy = [
+        (point.payload.get('ostatnie_uzycie', 0), str(point.id))
+        for point in iteruj_punkty(client, "ai_cache", ["ostatnie_uzycie"])
+    ]
+    wpisy.sort()
+    do_usuniecia = [point_id for _, point_id in wpisy[:len(wpisy) - AI_CACHE_MAX]]
+    client.delete(collection_name=collection_name, points_selector=PointIdsList(points=do_usuniecia))
+
+# Uprawa z szablonu w pamięci podręcznej, a przy jego braku z OpenAI (i zapis
+# szablonu do pamięci). Z na_zadanie odpowiedź jest strumieniowana, a funkcja
+# wywoływana dla każdego odebranego zadania. Ucięte odpowiedzi nie trafiają do
+# pamięci podręcznej. dobierz_przyklady(nazwy) -> {nazwa: [kalendarze]} jest
+# wywoływana tylko przy braku w pamięci podręcznej.
+def wygeneruj_kalendarz_z_cache(client, client_openai, nazwa_uprawy, rok, na_zadanie=None, dobierz_przyklady=None):
+    klucz = klucz_szablonu_ai(nazwa_uprawy)
+    try:
+        szablon = pobierz_szablon_ai_z_cache(client, klucz)
+    except Exception as e:
+        # Pamięć podręczna jest tylko przyspieszeniem - błąd nie blokuje generowania
+        konfiguracja.log.warning("Błąd odczytu pamięci podręcznej kalendarzy: %s", e)
+        szablon = None
+    if szablon is not None:
+        return instancjonuj_szablon(szablon, rok)
+    przyklady, odciski = _dobierz_przyklady(dobierz_przyklady, [nazwa_uprawy], rok)
+    przyklady = przyklady.get(nazwa_uprawy)
+    if nazwa_uprawy in odciski:
+        # Kalendarz z tymi samymi przykładami mógł już powstać w tym ogrodzie
+        klucz = klucz_szablonu_ai(nazwa_uprawy, odciski[nazwa_uprawy])
+        try:
+            szablon = pobierz_szablon_ai_z_cache(client, klucz)
+        except Exception as e:
+            konfiguracja.log.warning("Błąd odczytu pamięci podręcznej kalendarzy: %s", e)
+        if szablon is not None:
+            return instancjonuj_szablon(szablon, rok)
+    if na_zadanie is None:
+        kalendarz = wygeneruj_kalendarz_upraw(client_openai, nazwa_uprawy, rok, przyklady)
+        kompletny = True
+    else:
+        kalendarz, kompletny = wygeneruj_kalendarz_strumieniowo(client_openai, nazwa_uprawy, rok, na_zadanie, przyklady)
+    if not kalendarz or 'zadania' not in kalendarz:
+        return None
+    uprawa = Uprawa.z_payloadu(kalendarz)
+    if kompletny:
+        try:
+            zapisz_szablon_ai_do_cache(client, klucz, utworz_szablon(uprawa.nazwa, uprawa.zadania))
+        except Exception as e:
+            konfiguracja.zglos('warning', f"Nie udało się zapisać kalendarza w pamięci podręcznej: {e}")
+    return uprawa
+
+# Kalendarze dla wielu upraw: najpierw jedno zapytanie do pamięci podręcznej,
+# potem równoległe generowanie brakujących. postep(nazwa, kalendarz, blad) jest
+# wywoływany w wątku skryptu po każdej zakończonej uprawie.
+# Zwraca {nazwa: Uprawa} dla udanych i {nazwa: błąd} dla nieudanych.
+def wygeneruj_wiele_kalendarzy(client, client_openai, nazwy, rok, postep=None, dobierz_przyklady=None):
+    klucze = {nazwa: klucz_szablonu_ai(nazwa) for nazwa in nazwy}
+    try:
+        z_cache = pobierz_szablony_ai_z_cache(client, list(set(klucze.values())))
+    except Exception as e:
+        konfiguracja.log.warning("Błąd odczytu pamięci podręcznej kalendarzy: %s", e)
+        z_cache = {}
+
+    kalendarze, bledy = {}, {}
+    do_wygenerowania = []
+    for nazwa in nazwy:
+        if klucze[nazwa] in z_cache:
+            kalendarze[nazwa] = instancjonuj_szablon(z_cache[klucze[nazwa]], rok)
+            if postep:
+                postep(nazwa, kalendarze[nazwa], None)
+        else:
+            do_wygenerowania.append(nazwa)
+
+    przyklady, odciski = _dobierz_przyklady(dobierz_przyklady, do_wygenerowania, rok) if do_wygenerowania else ({}, {})
+    if odciski:
+        # Kalendarze z tymi samymi przykładami mogły już powstać w tym ogrodzie
+        for nazwa, odcisk in odciski.items():
+            klucze[nazwa] = klucz_szablonu_ai(nazwa, odcisk)
+        try:
+            z_cache = pobierz_szablony_ai_z_cache(client, list({klucze[nazwa] for nazwa in odciski}))
+        except Exception as e:
+            konfiguracja.log.warning("Błąd odczytu pamięci podręcznej kalendarzy: %s", e)
+            z_cache = {}
+        for nazwa in do_wygenerowania:
+            if klucze[nazwa] in z_cache:
+                kalendarze[nazwa] = instancjonuj_szablon(z_cache[klucze[nazwa]], rok)
+                if postep:
+                    postep(nazwa, kalendarze[nazwa], None)
+        do_wygenerowania = [nazwa for nazwa in do_wygenerowania if nazwa not in kalendarze]
+
+    nowe = {}
+    ogranicznik = OgranicznikZapytan(AI_ZAPYTAN_NA_MINUTE)
+    client_bez_ponowien = client_openai.with_options(max_retries=0)
+    with ThreadPoolExecutor(max_workers=AI_ROWNOLEGLOSC) as pula:
+        zadania_puli = {
+            pula.submit(
+                zapytaj_o_kalendarz_z_ponowieniami, client_bez_ponowien, nazwa, rok, ogranicznik, przyklady.get(nazwa)
+            ): nazwa
+            for nazwa in do_wygenerowania
+        }
+        for future in as_completed(zadania_puli):
+            nazwa = zadania_puli[future]
+            try:
+                kalendarz = future.result()
+                if 'zadania' not in kalendarz:
+                    raise ValueError("odpowiedź bez listy zadań")
+                kalendarze[nazwa] = uprawa = Uprawa.z_payloadu(kalendarz)
+                nowe[klucze[nazwa]] = utworz_szablon(uprawa.nazwa, uprawa.zadania)
+                if postep:
+                    postep(nazwa, uprawa, None)
+            except Exception as e:
+                bledy[nazwa] = e
+                if postep:
+                    postep(nazwa, None, e)
+
+    if nowe:
+        try:
+            zapisz_szablony_ai_do_cache(client, nowe)
+        except Exception as e:
+            konfiguracja.zglos('warning', f"Nie udało się zapisać kalendarzy w pamięci podręcznej: {e}")
+    return kalendarze, bledy
+
+# Najwięcej zadań jednego przykładu w prompcie
+PRZYKLADY_ZADAN = 12
+
+# Przykłady do promptu przesunięte na rok generowania i skrócone, oraz odciski
+# przykładów do klucza pamięci podręcznej - liczone z szablonów, więc te same
+# przykłady dają ten sam odcisk w każdym roku. Zwraca ({nazwa: [przykłady]},
+# {nazwa: odcisk}); odcisk jest tylko dla nazw z niepustą listą przykładów.
+# Błąd doboru przykładów nie blokuje generowania.
+def _dobierz_przyklady(dobierz_przyklady, nazwy, rok):
+    if dobierz_przyklady is None:
+        return {}, {}
+    try:
+        przyklady = dobierz_przyklady(nazwy)
+    except Exception as e:
+        konfiguracja.log.warning("Błąd doboru przykładów do promptu: %s", e)
+        return {}, {}
+    wynik, odciski = {}, {}
+    for nazwa, uprawy_przykladow in przyklady.items():
+        wynik[nazwa], szablony = [], []
+        for uprawa in uprawy_przykladow:
+            if not uprawa.zadania:
+                continue
+            szablon = utworz_szablon(uprawa.nazwa, uprawa.zadania[:PRZYKLADY_ZADAN])
+            szablony.append(szablon)
+            przyklad = instancjonuj_szablon(szablon, rok)
+            wynik[nazwa].append({
+                'nazwa': przyklad.nazwa,
+                'zadania': [{'data': zadanie.data.isoformat(), 'opis': zadanie.opis} for zadanie in przyklad.zadania]
+            })
+        if szablony:
+            odciski[nazwa] = uuid.uuid5(NAMESPACE_OGRODNICZKA, json.dumps(szablony, ensure_ascii=False)).hex[:16]
+    return wynik, odciski
@@ -0,0 +1,79 @@
+# Plik .ics z zadaniami wybranych upraw (wydarzenia całodniowe) do
+# zasubskrybowania w kalendarzu telefonu. Wydarzenia każdej uprawy są
+# składane raz na wersję uprawy (zaktualizowano) i trzymane w pamięci
+# procesu - po zmianie jednej uprawy przeliczana jest tylko ona.
+import time
+import uuid
+from datetime import timedelta
+
+from ogrodniczka.baza import NAMESPACE_OGRODNICZKA, tryb_zadan, pobierz_zadania_uprawy
+
+ICS_CACHE_MAX = 1000
+
+def _tekst_ics(tekst):
+    return tekst.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+# Linia zawinięta co 75 bajtów (RFC 5545), bez dzielenia znaków UTF-8
+def _linia_ics(linia):
+    if len(linia.encode('utf-8')) <= 75:
+        return linia + "\r\n"
+    czesci, obecna, rozmiar = [], '', 0
+    for znak in linia:
+        dlugosc = len(znak.encode('utf-8'))
+        if rozmiar + dlugosc > (74 if czesci else 75):
+            czesci.append(obecna)
+            obecna, rozmiar = '', 0
+        obecna += znak
+        rozmiar += dlugosc
+    czesci.append(obecna)
+    return "\r\n ".join(czesci) + "\r\n"
+
+def wydarzenia_ics(uprawa_id, uprawa, zadania):
+    znacznik = time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(uprawa.zaktualizowano))
+    linie, powtorzenia = [], {}
+    for zadanie in zadania:
+        # Stały UID: ID punktu zadania, a w trybie "uprawy" treść zadania
+        klucz = zadanie.id or f"{zadanie.data}:{zadanie.opis}"
+        powtorzenia[klucz] = powtorzenia.get(klucz, 0) + 1
+        uid = uuid.uuid5(NAMESPACE_OGRODNICZKA, f"ics:{uprawa_id}:{klucz}:{powtorzenia[klucz]}")
+        linie += [
+            "BEGIN:VEVENT",
+            f"UID:{uid}@ogrodniczka",
+            f"DTSTAMP:{znacznik}",
+            f"DTSTART;VALUE=DATE:{zadanie.data:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{zadanie.data + timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:{_tekst_ics(('✅ ' if zadanie.zrealizowane else '') + f'{uprawa.nazwa}: {zadanie.opis}')}",
+            f"CATEGORIES:{_tekst_ics(uprawa.nazwa)}",
+            "TRANSP:TRANSPARENT",
+            "END:VEVENT"
+        ]
+    return ''.join(_linia_ics(linia) for linia in linie)
+
+# uprawa_id -> (wersja, blok wydarzeń), wspólne dla całego procesu
+_pamiec_ics = {}
+
+def kalendarz_ics(client, uprawy, wybrane_uprawy):
+    pamiec = _pamiec_ics
+    bloki = []
+    for uprawa_id in wybrane_uprawy:
+        if uprawa_id not in uprawy:
+            continue
+        uprawa = uprawy[uprawa_id]
+        wersja = (uprawa.nazwa, uprawa.zaktualizowano)
+        if uprawa_id not in pamiec or pamiec[uprawa_id][0] != wersja:
+            zadania = pobierz_zadania_uprawy(client, uprawa_id) if tryb_zadan() else uprawa.zadania
+            pamiec.pop(uprawa_id, None)
+            pamiec[uprawa_id] = (wersja, wydarzenia_ics(uprawa_id, uprawa, zadania))
+        bloki.append(pamiec[uprawa_id][1])
+    if len(pamiec) > ICS_CACHE_MAX:
+        for uprawa_id in list(pamiec)[:len(pamiec) - ICS_CACHE_MAX]:
+            pamiec.pop(uprawa_id)
+    naglowek = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//ogrodniczka//Kalendarz ogrodnika//PL",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        "X-WR-CALNAME:Ogrodniczka"
+    ]
+    return ''.join(_linia_ics(linia) for linia in naglowek) + ''.join(bloki) + _linia_ics("END:VCALENDAR")
@@ -0,0 +1,189 @@
+# Indeksy zadań według dat i zapytania widoków: zadania na dzień i w zakresie
+# dat, siatka miesiąca i przegląd roku. Wszystko liczone w pamięci na danych
+# wczytanych raz na wersję, bez Streamlit.
+import calendar
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from ogrodniczka.baza import (
+    tryb_zadan, pobierz_uprawy_z_bazy, pobierz_wybrane_uprawy_z_bazy, pobierz_zadania_uprawy,
+    pobierz_zadania_w_oknach
+)
+from ogrodniczka.model import Uprawa
+
+# Indeks zadań według daty: dzień -> lista (uprawa_id, indeks zadania, zadanie).
+# Budowany raz na wersję danych, zamiast przeszukiwać wszystkie uprawy dla każdego dnia.
+def zbuduj_indeks_dat(uprawy):
+    indeks = {}
+    for uprawa_id, uprawa in uprawy.items():
+        for i, zadanie in enumerate(uprawa.zadania):
+            indeks.setdefault(zadanie.data, []).append((uprawa_id, i, zadanie))
+    return indeks
+
+# Funkcja do pobierania zadań na dany dzień
+def pobierz_zadania_na_dzien(data, indeks_dat, uprawy, wybrane_uprawy):
+    if isinstance(data, datetime):
+        data = data.date()
+    wybrane = set(wybrane_uprawy)
+    zadania = []
+    for uprawa_id, _, zadanie in indeks_dat.get(data, []):
+        if uprawa_id in wybrane:
+            zadania.append({
+                'uprawa': uprawy[uprawa_id].nazwa,
+                'opis': zadanie.opis
+            })
+    return zadania
+
+# Posortowany indeks zadań do zapytań o zakres dat: dni jako liczby porządkowe
+# (date.toordinal) w tablicy NumPy, wyszukiwane binarnie dla dowolnego okna
+# (tydzień, miesiąc, sezon, rok).
+def zbuduj_indeks_zakresow(indeks_dat):
+    dni, kody, zadania = [], [], []
+    kody_upraw = {}
+    for dzien in sorted(indeks_dat):
+        ordinal = dzien.toordinal()
+        for uprawa_id, _, zadanie in indeks_dat[dzien]:
+            dni.append(ordinal)
+            kody.append(kody_upraw.setdefault(uprawa_id, len(kody_upraw)))
+            zadania.append(zadanie)
+    return {
+        'dni': np.array(dni, dtype=np.int64),
+        'kody': np.array(kody, dtype=np.int64),
+        'uprawy': list(kody_upraw),
+        'zadania': zadania
+    }
+
+# Funkcja do pobierania zadań w zakresie dat
+def pobierz_zadania_w_zakresie(data_od, data_do, indeks_zakresow, uprawy, wybrane_uprawy):
+    dni = indeks_zakresow['dni']
+    od = np.searchsorted(dni, data_od.toordinal(), side='left')
+    do = np.searchsorted(dni, data_do.toordinal(), side='right')
+    wybrane = set(wybrane_uprawy)
+    wybrane_kody = [kod for kod, uprawa_id in enumerate(indeks_zakresow['uprawy']) if uprawa_id in wybrane]
+    trafienia = od + np.flatnonzero(np.isin(indeks_zakresow['kody'][od:do], wybrane_kody))
+    zadania = []
+    for pozycja in trafienia:
+        uprawa_id = indeks_zakresow['uprawy'][indeks_zakresow['kody'][pozycja]]
+        zadania.append({
+            'data': date.fromordinal(int(dni[pozycja])),
+            'uprawa': uprawy[uprawa_id].nazwa,
+            'opis': indeks_zakresow['zadania'][pozycja].opis
+        })
+    # Indeks jest już posortowany po dacie, więc wynik nie wymaga sortowania
+    return zadania
+
+# Dane widoków: uprawy, zapisane ustawienia i indeksy dat, oznaczone wersją.
+# 'wybrane_uprawy' to None, jeśli ustawień jeszcze nie zapisano.
+def wczytaj_dane(client, wersja=0):
+    uprawy = pobierz_uprawy_z_bazy(client)
+    indeks_dat = zbuduj_indeks_dat(uprawy)
+    return {
+        'wersja': wersja,
+        'uprawy': uprawy,
+        'wybrane_uprawy': pobierz_wybrane_uprawy_z_bazy(client),
+        'indeks_dat': indeks_dat,
+        'indeks_zakresow': zbuduj_indeks_zakresow(indeks_dat)
+    }
+
+# Indeksy dla widoku kalendarza. W trybie "zadania" budowane są tylko z zadań
+# z wyświetlanych okien dat, pobranych zapytaniem z filtrem na dacie.
+def pobierz_indeksy(client, dane, okna):
+    if not tryb_zadan():
+        return dane['indeks_dat'], dane['indeks_zakresow']
+    klucz = tuple(okna)
+    if dane.get('okna') != klucz:
+        uprawy_okna = {uprawa_id: Uprawa(uprawa.nazwa) for uprawa_id, uprawa in dane['uprawy'].items()}
+        for uprawa_id, zadanie in pobierz_zadania_w_oknach(client, okna):
+            if uprawa_id in uprawy_okna:
+                uprawy_okna[uprawa_id].zadania.append(zadanie)
+        for uprawa in uprawy_okna.values():
+            uprawa.zadania.sort(key=lambda zadanie: zadanie.data)
+        dane['okna'] = klucz
+        dane.pop('siatki', None)
+        dane['indeks_dat'] = zbuduj_indeks_dat(uprawy_okna)
+        dane['indeks_zakresow'] = zbuduj_indeks_zakresow(dane['indeks_dat'])
+    return dane['indeks_dat'], dane['indeks_zakresow']
+
+# Pełna lista zadań uprawy dla edytora (w trybie "zadania" pobierana osobno)
+def pobierz_zadania_do_edycji(client, dane, uprawa_id):
+    if not tryb_zadan():
+        return dane['uprawy'][uprawa_id].zadania
+    zadania_upraw = dane.setdefault('zadania_upraw', {})
+    if uprawa_id not in zadania_upraw:
+        zadania_upraw[uprawa_id] = pobierz_zadania_uprawy(client, uprawa_id)
+    return zadania_upraw[uprawa_id]
+
+# Przegląd roku: liczba zadań każdej uprawy w każdym dniu roku jako macierz
+# (uprawy x dni), liczona wektorowo raz na wersję danych i rok. Zawężenie do
+# wybranych upraw i agregaty (tygodnie, miesiące, pory roku) to już tylko
+# sumy na tej macierzy.
+def zbuduj_przeglad_roku(rok, uprawy_ids, zadania):
+    dni = np.arange(f"{rok}-01-01", f"{rok + 1}-01-01", dtype='datetime64[D]')
+    macierz = np.zeros((len(uprawy_ids), len(dni)), dtype=np.int32)
+    kody = {uprawa_id: i for i, uprawa_id in enumerate(uprawy_ids)}
+    pary = [(kody[uprawa_id], data) for uprawa_id, data in zadania if uprawa_id in kody]
+    if pary:
+        kody_upraw, daty = zip(*pary)
+        przesuniecia = (np.array(daty, dtype='datetime64[D]') - dni[0]).astype(np.int64)
+        poprawne = (przesuniecia >= 0) & (przesuniecia < len(dni))
+        np.add.at(macierz, (np.asarray(kody_upraw)[poprawne], przesuniecia[poprawne]), 1)
+    return {'uprawy': list(uprawy_ids), 'dni': dni, 'macierz': macierz}
+
+def pobierz_przeglad_roku(client, dane, rok):
+    przeglady = dane.setdefault('przeglady', {})
+    if rok not in przeglady:
+        if tryb_zadan():
+            zadania = (
+                (uprawa_id, zadanie.data)
+                for uprawa_id, zadanie in pobierz_zadania_w_oknach(client, [(date(rok, 1, 1), date(rok, 12, 31))])
+            )
+        else:
+            zadania = (
+                (uprawa_id, zadanie.data)
+                for uprawa_id, uprawa in dane['uprawy'].items() for zadanie in uprawa.zadania
+            )
+        przeglady[rok] = zbuduj_przeglad_roku(rok, list(dane['uprawy']), zadania)
+    return przeglady[rok]
+
+# Miesiąc jest rysowany jako jedna tabela z wyborem pojedynczej komórki zamiast
+# ~50 przycisków w kolumnach. Etykiety dni (emoji upraw + numer dnia), daty
+# komórek i legenda są liczone z indeksu dat raz na wersję indeksu i wybór upraw.
+DNI_TYGODNIA = ['Pon', 'Wt', 'Śr', 'Czw', 'Pt', 'Sob', 'Nie']
+
+def zbuduj_siatke_miesiaca(rok, miesiac, indeks_dat, uprawy, wybrane_uprawy):
+    wybrane = set(wybrane_uprawy)
+    etykiety, daty = [], []
+    for tydzien in calendar.monthcalendar(rok, miesiac):
+        etykiety.append([])
+        daty.append([])
+        for dzien in tydzien:
+            if dzien == 0:
+                etykiety[-1].append("")
+                daty[-1].append(None)
+                continue
+            data = date(rok, miesiac, dzien)
+            # Emoji dla każdej uprawy z zadaniem na ten dzień
+            emoji_list = []
+            widziane = set()
+            for uprawa_id, _, _ in indeks_dat.get(data, []):
+                if uprawa_id in wybrane and uprawa_id not in widziane:
+                    widziane.add(uprawa_id)
+                    emoji_list.append(uprawy[uprawa_id].emoji or '🟩')
+            etykiety[-1].append(f"{''.join(emoji_list)} {dzien}" if emoji_list else f"{dzien}")
+            daty[-1].append(str(data))
+    legenda = [
+        f"{uprawy[uprawa_id].emoji or '🟩'} {uprawy[uprawa_id].nazwa}"
+        for uprawa_id in wybrane_uprawy if uprawa_id in uprawy
+    ]
+    return {'tabela': pd.DataFrame(etykiety, columns=DNI_TYGODNIA), 'daty': daty, 'legenda': legenda}
+
+def pobierz_siatke_miesiaca(dane, indeks_dat, rok, miesiac, wybrane_uprawy):
+    # Pamięć siatek jest czyszczona razem z indeksem dat (nowa wersja danych
+    # albo nowe okna w trybie "zadania")
+    siatki = dane.setdefault('siatki', {})
+    klucz = (rok, miesiac, tuple(wybrane_uprawy))
+    if klucz not in siatki:
+        siatki[klucz] = zbuduj_siatke_miesiaca(rok, miesiac, indeks_dat, dane['uprawy'], wybrane_uprawy)
+    return siatki[klucz]
@@ -0,0 +1,21 @@
+# Ustawienia wspólne dla interfejsu Streamlit i CLI. Rdzeń nie importuje
+# Streamlit: tryb przechowywania ustawia warstwa wywołująca (UI z secrets, CLI
+# z opcji), a komunikaty dla użytkownika i powiadomienie o zapisie można
+# podmienić - domyślnie komunikaty trafiają do logów.
+import logging
+import os
+
+log = logging.getLogger("ogrodniczka")
+
+# Tryb przechowywania zadań: "uprawy" albo "zadania" (patrz baza.tryb_zadan)
+tryb_przechowywania = os.environ.get("TRYB_PRZECHOWYWANIA", "uprawy")
+
+POZIOMY = {'error': logging.ERROR, 'warning': logging.WARNING, 'info': logging.INFO}
+
+# Komunikat dla użytkownika; poziom to 'error', 'warning' albo 'info'
+def zglos(poziom, tekst):
+    log.log(POZIOMY[poziom], tekst)
+
+# Wywoływana po każdym zapisie upraw lub zadań (UI unieważnia wtedy dane sesji)
+def po_zapisie():
+    pass
@@ -0,0 +1,178 @@
+# Kopia całej kolekcji: NDJSON (ustawienia, uprawy i zadania jako osobne
+# rekordy - pełna kopia) albo tabela CSV/Parquet z wierszem na zadanie (uprawa
+# bez zadań ma wiersz z pustą datą). Eksport przewija kolekcję stronami i
+# zapisuje plik kawałkami; import zapisuje uprawy paczkami po ROZMIAR_PACZKI
+# zadań. Rekordy jednej uprawy muszą być w pliku obok siebie - tak jak w
+# eksporcie - bo paczka zawsze zawiera całe uprawy.
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ogrodniczka import konfiguracja
+from ogrodniczka.baza import (
+    ROZMIAR_PACZKI, POLA_UPRAWY, iteruj_punkty, tryb_zadan, pobierz_zadania_uprawy,
+    pobierz_wybrane_uprawy_z_bazy, wyslij_operacje, _operacje_upraw
+)
+from ogrodniczka.model import Uprawa, Zadanie
+
+FORMATY_KOPII = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+SCHEMAT_TABELI = pa.schema([
+    ('uprawa_id', pa.string()),
+    ('nazwa', pa.string()),
+    ('emoji', pa.string()),
+    ('data', pa.date32()),
+    ('opis', pa.string()),
+    ('zrealizowane', pa.bool_())
+])
+
+# Uprawy z zadaniami, po jednej - w trybie "zadania" zadania są pobierane
+# osobno dla każdej uprawy, więc w pamięci jest tylko bieżąca uprawa
+def iteruj_uprawy(client):
+    widziane = set()
+    for point in iteruj_punkty(client, "uprawa", POLA_UPRAWY):
+        uprawa_id = point.payload['uprawa_id']
+        if uprawa_id in widziane:
+            continue
+        widziane.add(uprawa_id)
+        uprawa = Uprawa.z_payloadu(point.payload)
+        if tryb_zadan():
+            uprawa.zadania = pobierz_zadania_uprawy(client, uprawa_id)
+        yield uprawa_id, uprawa
+
+def rekordy_kopii(client):
+    yield {"typ": "ustawienia", "wybrane_uprawy": pobierz_wybrane_uprawy_z_bazy(client) or []}
+    for uprawa_id, uprawa in iteruj_uprawy(client):
+        yield {"typ": "uprawa", "uprawa_id": uprawa_id, **uprawa.payload(z_zadaniami=False)}
+        for zadanie in uprawa.zadania:
+            yield {"typ": "zadanie", "uprawa_id": uprawa_id, **zadanie.payload()}
+
+# Wiersze tabeli w ramkach po ok. ROZMIAR_PACZKI wierszy
+def ramki_kopii(client):
+    wiersze = []
+    for uprawa_id, uprawa in iteruj_uprawy(client):
+        for zadanie in uprawa.zadania or [None]:
+            wiersze.append({
+                'uprawa_id': uprawa_id,
+                'nazwa': uprawa.nazwa,
+                'emoji': uprawa.emoji,
+                'data': zadanie.data if zadanie else None,
+                'opis': zadanie.opis if zadanie else None,
+                'zrealizowane': zadanie.zrealizowane if zadanie else None
+            })
+        if len(wiersze) >= ROZMIAR_PACZKI:
+            yield pd.DataFrame(wiersze, columns=SCHEMAT_TABELI.names)
+            wiersze = []
+    if wiersze:
+        yield pd.DataFrame(wiersze, columns=SCHEMAT_TABELI.names)
+
+# Zapis kopii do pliku binarnego w formacie 'ndjson', 'csv' lub 'parquet'
+def eksportuj_kopie(client, plik, format):
+    if format == 'ndjson':
+        for rekord in rekordy_kopii(client):
+            plik.write((json.dumps(rekord, ensure_ascii=False) + "\n").encode('utf-8'))
+    elif format == 'csv':
+        tekst = io.TextIOWrapper(plik, encoding='utf-8', newline='')
+        pd.DataFrame(columns=SCHEMAT_TABELI.names).to_csv(tekst, index=False)
+        for ramka in ramki_kopii(client):
+            ramka.to_csv(tekst, index=False, header=False)
+        tekst.detach()
+    elif format == 'parquet':
+        with pq.ParquetWriter(plik, SCHEMAT_TABELI) as zapis:
+            for ramka in ramki_kopii(client):
+                zapis.write_table(pa.Table.from_pandas(ramka, schema=SCHEMAT_TABELI, preserve_index=False))
+    else:
+        raise ValueError(f"nieznany format kopii: {format!r}")
+
+def _tekst_komorki(wartosc):
+    return '' if wartosc is None or (isinstance(wartosc, float) and np.isnan(wartosc)) else str(wartosc).strip()
+
+# Wiersze tabeli jako rekordy kopii: rekord uprawy przy każdej zmianie
+# uprawa_id, rekord zadania dla wierszy z datą
+def _rekordy_z_ramek(ramki):
+    ostatnia = None
+    for ramka in ramki:
+        for wiersz in ramka.to_dict('records'):
+            uprawa_id = _tekst_komorki(wiersz.get('uprawa_id'))
+            if uprawa_id != ostatnia:
+                ostatnia = uprawa_id
+                yield {
+                    "typ": "uprawa", "uprawa_id": uprawa_id,
+                    "nazwa": _tekst_komorki(wiersz.get('nazwa')) or uprawa_id,
+                    "emoji": _tekst_komorki(wiersz.get('emoji')) or None
+                }
+            if _tekst_komorki(wiersz.get('data')):
+                yield {
+                    "typ": "zadanie", "uprawa_id": uprawa_id,
+                    "data": _tekst_komorki(wiersz['data'])[:10],
+                    "opis": _tekst_komorki(wiersz.get('opis')),
+                    "zrealizowane": _tekst_komorki(wiersz.get('zrealizowane')).lower() in ('true', '1', 'tak')
+                }
+
+def rekordy_z_pliku(plik, format):
+    if format == 'ndjson':
+        # Odłączenie zamiast zamknięcia - plik należy do wywołującego
+        tekst = io.TextIOWrapper(plik, encoding='utf-8')
+        try:
+            for linia in tekst:
+                if linia.strip():
+                    yield json.loads(linia)
+        finally:
+            tekst.detach()
+    elif format == 'csv':
+        yield from _rekordy_z_ramek(pd.read_csv(
+            plik, chunksize=ROZMIAR_PACZKI, dtype=str, keep_default_na=False, encoding='utf-8'
+        ))
+    elif format == 'parquet':
+        partie = pq.ParquetFile(plik).iter_batches(batch_size=ROZMIAR_PACZKI)
+        yield from _rekordy_z_ramek(partia.to_pandas() for partia in partie)
+    else:
+        raise ValueError(f"nieznany format kopii: {format!r}")
+
+# Import rekordów kopii - uprawy o tych samych uprawa_id są nadpisywane.
+# Zwraca (zaimportowane uprawy, liczba zadań, wybrane uprawy z kopii lub None).
+# ValueError przy błędnym rekordzie; paczki zapisane wcześniej zostają w bazie,
+# a ponowny import tego samego pliku niczego nie dubluje.
+def importuj_kopie(client, rekordy):
+    paczka, w_paczce = {}, 0
+    zaimportowane, liczba_zadan, wybrane = [], 0, None
+    # Zbiór obok listy: sprawdzenie każdej nowej uprawy w liście byłoby O(n²)
+    widziane = set()
+    try:
+        for nr, rekord in enumerate(rekordy, start=1):
+            try:
+                typ = rekord.get('typ')
+                if typ == 'ustawienia':
+                    wybrane = [str(uprawa_id) for uprawa_id in rekord.get('wybrane_uprawy') or []]
+                    continue
+                if typ not in ('uprawa', 'zadanie'):
+                    raise ValueError(f"nieznany typ rekordu {typ!r}")
+                uprawa_id = str(rekord['uprawa_id'])
+                if uprawa_id not in paczka:
+                    if uprawa_id in widziane:
+                        raise ValueError(f"rekordy uprawy '{uprawa_id}' nie są obok siebie")
+                    if w_paczce >= ROZMIAR_PACZKI:
+                        wyslij_operacje(client, _operacje_upraw(paczka))
+                        paczka, w_paczce = {}, 0
+                    paczka[uprawa_id] = Uprawa(rekord.get('nazwa') or uprawa_id)
+                    zaimportowane.append(uprawa_id)
+                    widziane.add(uprawa_id)
+                    w_paczce += 1
+                if typ == 'uprawa':
+                    paczka[uprawa_id].nazwa = rekord.get('nazwa') or uprawa_id
+                    paczka[uprawa_id].emoji = rekord.get('emoji') or None
+                else:
+                    paczka[uprawa_id].zadania.append(Zadanie.z_payloadu(rekord))
+                    liczba_zadan += 1
+                    w_paczce += 1
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"rekord {nr}: {e}") from e
+        if paczka:
+            wyslij_operacje(client, _operacje_upraw(paczka))
+    finally:
+        if zaimportowane:
+            konfiguracja.po_zapisie()
+    return zaimportowane, liczba_zadan, wybrane
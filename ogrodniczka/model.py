@@ -0,0 +1,60 @@
+# Uprawy i zadania w pamięci to dataclassy ze slotami, a daty zadań są obiektami
+# date - widoki nie parsują już napisów. Zamiana na payload Qdrant (daty jako
+# 'YYYY-MM-DD') odbywa się tylko tutaj. Kalendarze z OpenAI mają kształt
+# payloadu uprawy, więc też wchodzą do modelu przez Uprawa.z_payloadu.
+from dataclasses import dataclass, field
+from datetime import date
+
+@dataclass(slots=True)
+class Zadanie:
+    data: date
+    opis: str
+    zrealizowane: bool = False
+    id: str | None = None
+
+    @classmethod
+    def z_payloadu(cls, payload, id=None):
+        return cls(date.fromisoformat(payload['data']), payload['opis'], payload.get('zrealizowane', False), id)
+
+    def payload(self):
+        return {"data": self.data.isoformat(), "opis": self.opis, "zrealizowane": self.zrealizowane}
+
+@dataclass(slots=True)
+class Uprawa:
+    nazwa: str
+    zadania: list = field(default_factory=list)
+    emoji: str | None = None
+    # Liczba zapisanych zadań pominiętych przy wczytaniu (brak lub zła data) -
+    # pozycje na liście nie odpowiadają wtedy pozycjom w payloadzie
+    pominiete: int = 0
+    # Czas ostatniego zapisu uprawy lub jej zadań - wersja uprawy
+    zaktualizowano: float = 0
+
+    @classmethod
+    def z_payloadu(cls, payload):
+        zadania = []
+        for zadanie in payload.get('zadania') or []:
+            try:
+                zadania.append(Zadanie.z_payloadu(zadanie))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return cls(
+            payload['nazwa'], zadania, payload.get('emoji'),
+            len(payload.get('zadania') or []) - len(zadania), payload.get('zaktualizowano', 0)
+        )
+
+    def payload(self, z_zadaniami=True):
+        payload = {"nazwa": self.nazwa}
+        if z_zadaniami:
+            payload["zadania"] = [zadanie.payload() for zadanie in self.zadania]
+        if self.emoji:
+            payload["emoji"] = self.emoji
+        return payload
+
+# Pola zmienione w modelu jako wartości payloadu
+def _pola_payloadu(pola):
+    return {pole: wartosc.isoformat() if isinstance(wartosc, date) else wartosc for pole, wartosc in pola.items()}
+
+# Identyfikator uprawy z nazwy: małe litery, bez polskich znaków, spacje -> '_'
+def utworz_uprawa_id(nazwa):
+    return nazwa.lower().replace(' ', '_').replace('ą', 'a').replace('ć', 'c').replace('ę', 'e').replace('ł', 'l').replace('ń', 'n').replace('ó', 'o').replace('ś', 's').replace('ź', 'z').replace('ż', 'z')
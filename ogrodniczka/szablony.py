@@ -0,0 +1,41 @@
+# Szablon to harmonogram uprawy niezależny od roku, zapisany kolumnowo:
+# miesiące, dni, przesunięcie roku względem pierwszego roku uprawy (np. 1 dla
+# prac zimowych w styczniu kolejnego roku) i opisy. Utworzenie zadań na dany
+# rok to lokalna, zwektoryzowana operacja - bez zapytań do OpenAI.
+import numpy as np
+
+from ogrodniczka.model import Uprawa, Zadanie
+
+def szablon_z_terminow(nazwa, terminy):
+    return {
+        'nazwa': nazwa,
+        'miesiace': [miesiac for miesiac, _, _ in terminy],
+        'dni': [dzien for _, dzien, _ in terminy],
+        'lata': [0] * len(terminy),
+        'opisy': [opis for _, _, opis in terminy]
+    }
+
+def utworz_szablon(nazwa, zadania):
+    daty = np.array([zadanie.data for zadanie in zadania], dtype='datetime64[D]')
+    miesiace = daty.astype('datetime64[M]')
+    lata = miesiace.astype('datetime64[Y]').astype(np.int64)
+    return {
+        'nazwa': nazwa,
+        'miesiace': (miesiace.astype(np.int64) % 12 + 1).tolist(),
+        'dni': ((daty - miesiace.astype('datetime64[D]')).astype(np.int64) + 1).tolist(),
+        'lata': (lata - lata.min()).tolist() if len(lata) else [],
+        'opisy': [zadanie.opis for zadanie in zadania]
+    }
+
+def instancjonuj_szablon(szablon, rok):
+    # Początek miesiąca każdego zadania w docelowym roku
+    miesiace = (
+        (np.asarray(szablon['lata'], dtype=np.int64) + rok - 1970) * 12
+        + np.asarray(szablon['miesiace'], dtype=np.int64) - 1
+    ).astype('datetime64[M]')
+    poczatki = miesiace.astype('datetime64[D]')
+    # Dni, których nie ma w danym roku (29 lutego), przesuwamy na koniec miesiąca
+    dlugosci = (miesiace + 1).astype('datetime64[D]') - poczatki
+    dni = np.minimum(np.asarray(szablon['dni'], dtype=np.int64), dlugosci.astype(np.int64))
+    daty = (poczatki + (dni - 1)).tolist()
+    return Uprawa(szablon['nazwa'], [Zadanie(data, opis) for data, opis in zip(daty, szablon['opisy'])])
@@ -0,0 +1,189 @@
+# Nazwy upraw i opisy zadań są osadzane jako wektory w osobnej kolekcji (główna
+# kolekcja zostaje przy wektorze-atrapie), więc zapytania typu "co przycinać
+# wiosną" albo "uprawy podobne do bazylii" obsługuje wyszukiwanie wektorowe
+# Qdrant. Embedder OpenAI wymaga klucza API; lokalny, deterministyczny embedder
+# (hashowanie słów i trigramów znaków) działa offline, np. w testach.
+import functools
+import hashlib
+import re
+import uuid
+import zlib
+
+import numpy as np
+from qdrant_client.models import Distance, VectorParams, PointStruct, PayloadSchemaType, QueryRequest
+from qdrant_client.models import UpsertOperation, DeleteOperation, PointsList, PointIdsList
+
+from ogrodniczka.baza import (
+    NAMESPACE_OGRODNICZKA, POLA_ZADANIA, iteruj_punkty, tryb_zadan, wyslij_operacje, _filtr_typu, _zadanie_z_punktu
+)
+from ogrodniczka.indeks import pobierz_zadania_do_edycji
+from ogrodniczka.model import Uprawa, utworz_uprawa_id
+
+MODEL_OSADZEN = "text-embedding-3-small"
+WYMIAR_OSADZEN = 256
+PACZKA_OSADZEN = 256
+OSADZENIA_CACHE_MAX = 20000
+PRZYKLADY_UPRAW = 2
+PORY_ROKU = {
+    12: 'zima', 1: 'zima', 2: 'zima', 3: 'wiosna', 4: 'wiosna', 5: 'wiosna',
+    6: 'lato', 7: 'lato', 8: 'lato', 9: 'jesień', 10: 'jesień', 11: 'jesień'
+}
+WZORZEC_SLOW = re.compile(r'\w+')
+
+class EmbedderLokalny:
+    def __init__(self, wymiar=WYMIAR_OSADZEN):
+        self.wymiar = wymiar
+        self.nazwa = f"lokalny-{wymiar}"
+
+    def osadz(self, teksty):
+        wektory = np.zeros((len(teksty), self.wymiar), dtype=np.float32)
+        for i, tekst in enumerate(teksty):
+            slowa = WZORZEC_SLOW.findall(tekst.lower())
+            cechy = slowa + [f" {slowo} "[j:j + 3] for slowo in slowa for j in range(len(slowo))]
+            if not cechy:
+                continue
+            kody = np.array([zlib.crc32(cecha.encode()) for cecha in cechy], dtype=np.uint32)
+            # Znak z najwyższego bitu, żeby kolizje w kubełkach się znosiły
+            np.add.at(wektory[i], kody % self.wymiar, np.where(kody >> 31, -1.0, 1.0))
+        normy = np.linalg.norm(wektory, axis=1, keepdims=True)
+        return wektory / np.where(normy == 0, 1, normy)
+
+class EmbedderOpenAI:
+    def __init__(self, client_openai, model=MODEL_OSADZEN, wymiar=WYMIAR_OSADZEN):
+        self.client_openai = client_openai
+        self.model = model
+        self.wymiar = wymiar
+        self.nazwa = f"{model}-{wymiar}"
+
+    def osadz(self, teksty):
+        response = self.client_openai.embeddings.create(model=self.model, input=teksty, dimensions=self.wymiar)
+        return np.array([wynik.embedding for wynik in response.data], dtype=np.float32)
+
+# Embedder OpenAI, gdy jest klient i nie wybrano embeddera lokalnego
+def utworz_embedder(client_openai, rodzaj="openai"):
+    if client_openai and rodzaj != "lokalne":
+        return EmbedderOpenAI(client_openai)
+    return EmbedderLokalny()
+
+# Wspólna dla procesu pamięć osadzeń: skrót (embedder, tekst) -> wektor
+_pamiec_osadzen = {}
+
+# Osadzenia dla listy tekstów - z pamięci po skrócie tekstu, a brakujące
+# jednym żądaniem na PACZKA_OSADZEN tekstów
+def osadz_teksty(embedder, teksty):
+    pamiec = _pamiec_osadzen
+    skroty = [hashlib.sha1(f"{embedder.nazwa}:{tekst}".encode()).hexdigest() for tekst in teksty]
+    brakujace = list({skrot: tekst for skrot, tekst in zip(skroty, teksty) if skrot not in pamiec}.items())
+    for i in range(0, len(brakujace), PACZKA_OSADZEN):
+        paczka = brakujace[i:i + PACZKA_OSADZEN]
+        for (skrot, _), wektor in zip(paczka, embedder.osadz([tekst for _, tekst in paczka])):
+            pamiec[skrot] = wektor
+    if len(pamiec) > OSADZENIA_CACHE_MAX:
+        # Usuń najstarsze wpisy (słownik zachowuje kolejność dodania)
+        for skrot in list(pamiec)[:len(pamiec) - OSADZENIA_CACHE_MAX]:
+            pamiec.pop(skrot)
+    return np.array([pamiec[skrot] for skrot in skroty], dtype=np.float32).reshape(len(teksty), -1)
+
+# Kolekcja wektorów dla danego embeddera (nazwa zawiera model i wymiar),
+# sprawdzana raz na klienta
+@functools.cache
+def init_kolekcji_wektorow(client, nazwa_embeddera, wymiar):
+    collection_name = "kalendarz_ogrodnika_wektory_" + re.sub(r'[^a-z0-9]+', '_', nazwa_embeddera.lower())
+    if not client.collection_exists(collection_name):
+        client.create_collection(
+            collection_name=collection_name,
+            vectors_config=VectorParams(size=wymiar, distance=Distance.COSINE)
+        )
+        for pole in ("type", "uprawa_id"):
+            client.create_payload_index(
+                collection_name=collection_name, field_name=pole, field_schema=PayloadSchemaType.KEYWORD
+            )
+    return collection_name
+
+def _tekst_zadania(nazwa_uprawy, zadanie):
+    return f"{nazwa_uprawy} - {zadanie.opis}, {PORY_ROKU[zadanie.data.month]}"
+
+# Dokumenty do osadzenia: {id punktu: (tekst, payload)}. ID zależy od treści,
+# więc niezmienione uprawy i zadania nie są ponownie osadzane ani zapisywane.
+def _dokumenty_wektorowe(client, uprawy):
+    dokumenty = {}
+    def dodaj(tekst, payload):
+        klucz = f"{payload['type']}:{payload['uprawa_id']}:{payload.get('data', '')}:{tekst}"
+        dokumenty[str(uuid.uuid5(NAMESPACE_OGRODNICZKA, klucz))] = (tekst, payload)
+    for uprawa_id, uprawa in uprawy.items():
+        dodaj(uprawa.nazwa, {"type": "uprawa", "uprawa_id": uprawa_id, "nazwa": uprawa.nazwa})
+    if tryb_zadan():
+        zadania = (
+            (point.payload['uprawa_id'], _zadanie_z_punktu(point))
+            for point in iteruj_punkty(client, "zadanie", POLA_ZADANIA)
+        )
+    else:
+        zadania = ((uprawa_id, zadanie) for uprawa_id, uprawa in uprawy.items() for zadanie in uprawa.zadania)
+    for uprawa_id, zadanie in zadania:
+        if uprawa_id in uprawy:
+            dodaj(_tekst_zadania(uprawy[uprawa_id].nazwa, zadanie), {
+                "type": "zadanie", "uprawa_id": uprawa_id, "nazwa": uprawy[uprawa_id].nazwa,
+                "data": zadanie.data.isoformat(), "opis": zadanie.opis
+            })
+    return dokumenty
+
+# Uzgadnia kolekcję wektorów z danymi - raz na wersję danych. Osadzane są tylko
+# nowe teksty, a punkty usuniętych upraw i zadań są kasowane.
+def zsynchronizuj_indeks_wektorowy(client, embedder, dane):
+    collection_name = init_kolekcji_wektorow(client, embedder.nazwa, embedder.wymiar)
+    if dane.get('wektory') == embedder.nazwa:
+        return collection_name
+    dokumenty = _dokumenty_wektorowe(client, dane['uprawy'])
+    istniejace = {str(point.id) for point in iteruj_punkty(client, None, False, collection_name=collection_name)}
+    nowe = [point_id for point_id in dokumenty if point_id not in istniejace]
+    operacje = []
+    if nowe:
+        wektory = osadz_teksty(embedder, [dokumenty[point_id][0] for point_id in nowe])
+        points = [
+            PointStruct(id=point_id, vector=wektor.tolist(), payload=dokumenty[point_id][1])
+            for point_id, wektor in zip(nowe, wektory)
+        ]
+        operacje.append(UpsertOperation(upsert=PointsList(points=points)))
+    nieaktualne = list(istniejace - dokumenty.keys())
+    if nieaktualne:
+        operacje.append(DeleteOperation(delete=PointIdsList(points=nieaktualne)))
+    wyslij_operacje(client, operacje, collection_name=collection_name)
+    dane['wektory'] = embedder.nazwa
+    return collection_name
+
+# Wyniki wyszukiwania: lista (podobieństwo, payload), typ zawęża do "uprawa"/"zadanie"
+def szukaj_semantycznie(client, embedder, dane, zapytanie, limit=10, typ=None):
+    collection_name = zsynchronizuj_indeks_wektorowy(client, embedder, dane)
+    wektor = osadz_teksty(embedder, [zapytanie])[0]
+    wyniki = client.query_points(
+        collection_name=collection_name,
+        query=wektor.tolist(),
+        query_filter=_filtr_typu(typ) if typ else None,
+        limit=limit,
+        with_payload=True
+    ).points
+    return [(punkt.score, punkt.payload) for punkt in wyniki]
+
+# Kalendarze najbardziej podobnych upraw z ogrodu dla wielu nazw naraz - jedno
+# osadzenie i jedno zapytanie wsadowe. Zwraca {nazwa: [Uprawa]}.
+def podobne_kalendarze(client, embedder, dane, nazwy, limit=PRZYKLADY_UPRAW):
+    collection_name = zsynchronizuj_indeks_wektorowy(client, embedder, dane)
+    wektory = osadz_teksty(embedder, nazwy)
+    odpowiedzi = client.query_batch_points(
+        collection_name=collection_name,
+        requests=[
+            QueryRequest(query=wektor.tolist(), filter=_filtr_typu("uprawa"), limit=limit + 1, with_payload=["uprawa_id"])
+            for wektor in wektory
+        ]
+    )
+    przyklady = {}
+    for nazwa, odpowiedz in zip(nazwy, odpowiedzi):
+        podobne = [
+            punkt.payload['uprawa_id'] for punkt in odpowiedz.points
+            if punkt.payload['uprawa_id'] != utworz_uprawa_id(nazwa) and punkt.payload['uprawa_id'] in dane['uprawy']
+        ][:limit]
+        przyklady[nazwa] = [
+            Uprawa(dane['uprawy'][uprawa_id].nazwa, pobierz_zadania_do_edycji(client, dane, uprawa_id))
+            for uprawa_id in podobne
+        ]
+    return przyklady
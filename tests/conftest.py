@@ -0,0 +1,53 @@
+# Wspólne fixtury testów rdzenia. Testy działają bez sieci: Qdrant w pamięci
+# procesu, a komunikaty dla użytkownika są zbierane zamiast logowane.
+# Uruchamianie z katalogu repozytorium: python -m pytest
+import sys
+import warnings
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ogrodniczka import konfiguracja
+from ogrodniczka.baza import DOMYSLNE_SZABLONY, polacz, przygotuj_kolekcje, usun_uprawe_z_bazy
+
+@pytest.fixture(autouse=True)
+def komunikaty(monkeypatch):
+    zgloszone = []
+    monkeypatch.setattr(konfiguracja, 'zglos', lambda poziom, tekst: zgloszone.append((poziom, tekst)))
+    monkeypatch.setattr(konfiguracja, 'tryb_przechowywania', 'uprawy')
+    return zgloszone
+
+# Oba tryby przechowywania zadań
+@pytest.fixture(params=['uprawy', 'zadania'])
+def tryb(request, monkeypatch):
+    monkeypatch.setattr(konfiguracja, 'tryb_przechowywania', request.param)
+    return request.param
+
+# Pusta kolekcja w Qdrant w pamięci (bez domyślnych upraw)
+def _pusta_baza():
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Payload indexes have no effect")
+        client = polacz()
+        przygotuj_kolekcje(client)
+    for uprawa_id in DOMYSLNE_SZABLONY:
+        usun_uprawe_z_bazy(client, uprawa_id)
+    return client
+
+# Fabryka kolejnych niezależnych baz, np. celu importu
+@pytest.fixture
+def nowa_baza():
+    klienci = []
+
+    def utworz():
+        klienci.append(_pusta_baza())
+        return klienci[-1]
+
+    yield utworz
+    for client in klienci:
+        client.close()
+
+@pytest.fixture
+def client(nowa_baza):
+    return nowa_baza()
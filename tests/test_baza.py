@@ -0,0 +1,139 @@
+from datetime import date
+
+import pytest
+from qdrant_client.models import DeleteOperation, SetPayloadOperation, UpsertOperation
+
+from ogrodniczka.baza import (
+    _operacje_zmian, tryb_zadan, dodaj_zadania_do_bazy, pobierz_uprawy_z_bazy, pobierz_wybrane_uprawy_z_bazy,
+    pobierz_zadania_uprawy, przenies_ogrod_na_rok, zapisz_uprawy_do_bazy, zapisz_wybrane_uprawy_do_bazy,
+    zapisz_zmiany_uprawy
+)
+from ogrodniczka.model import Uprawa, Zadanie
+
+def _uprawa():
+    return Uprawa("Pomidory", [
+        Zadanie(date(2026, 3, 15), "Wysiew", id="00000000-0000-0000-0000-000000000001"),
+        Zadanie(date(2026, 5, 20), "Przesadzanie", id="00000000-0000-0000-0000-000000000002"),
+        Zadanie(date(2026, 8, 1), "Zbiór", id="00000000-0000-0000-0000-000000000003")
+    ], "🍅")
+
+def _wczytaj(client, uprawa_id="p"):
+    uprawa = pobierz_uprawy_z_bazy(client)[uprawa_id]
+    return uprawa, pobierz_zadania_uprawy(client, uprawa_id) if tryb_zadan() else uprawa.zadania
+
+def _stan(client, uprawa_id="p"):
+    uprawa, zadania = _wczytaj(client, uprawa_id)
+    return uprawa.nazwa, uprawa.emoji, [(zadanie.data, zadanie.opis, zadanie.zrealizowane) for zadanie in zadania]
+
+def test_bez_zmian_brak_operacji():
+    uprawa = _uprawa()
+    assert _operacje_zmian("p", uprawa, uprawa.zadania, {}) == []
+    # Wartości równe zapisanym nie są zmianą
+    assert _operacje_zmian("p", uprawa, uprawa.zadania, {
+        'zmienione': {1: {'opis': "Przesadzanie"}}, 'uprawa': {'emoji': "🍅"}
+    }) == []
+
+def test_zmiana_pola_w_trybie_upraw():
+    uprawa = _uprawa()
+    operacje = _operacje_zmian("p", uprawa, uprawa.zadania, {'zmienione': {1: {'zrealizowane': True}}})
+    assert [type(operacja) for operacja in operacje] == [SetPayloadOperation, SetPayloadOperation]
+    assert operacje[0].set_payload.key == "zadania[1]"
+    assert operacje[0].set_payload.payload == {'zrealizowane': True}
+    assert set(operacje[1].set_payload.payload) == {'zaktualizowano'}
+
+def test_dodanie_i_usuniecie_w_trybie_upraw_nadpisuje_liste():
+    uprawa = _uprawa()
+    operacje = _operacje_zmian("p", uprawa, uprawa.zadania, {
+        'zmienione': {2: {'opis': "Zbiór owoców"}}, 'usuniete': [0], 'dodane': [Zadanie(date(2026, 4, 1), "Hartowanie")]
+    })
+    assert len(operacje) == 1
+    assert [zadanie['opis'] for zadanie in operacje[0].set_payload.payload['zadania']] == [
+        "Hartowanie", "Przesadzanie", "Zbiór owoców"
+    ]
+
+def test_pominiete_zadania_wymuszaja_nadpisanie_listy():
+    uprawa = _uprawa()
+    uprawa.pominiete = 1
+    operacje = _operacje_zmian("p", uprawa, uprawa.zadania, {'zmienione': {0: {'opis': "Siew"}}})
+    assert len(operacje) == 1 and 'zadania' in operacje[0].set_payload.payload
+
+def test_zmiany_w_trybie_zadan(monkeypatch):
+    monkeypatch.setattr("ogrodniczka.konfiguracja.tryb_przechowywania", "zadania")
+    uprawa = _uprawa()
+    operacje = _operacje_zmian("p", uprawa, uprawa.zadania, {
+        'zmienione': {0: {'zrealizowane': True}, 1: {'zrealizowane': True}, 2: {'opis': "Zbiór owoców"}},
+        'usuniete': [2],
+        'dodane': [Zadanie(date(2026, 4, 1), "Hartowanie")]
+    })
+    assert [type(operacja) for operacja in operacje] == [
+        SetPayloadOperation, UpsertOperation, DeleteOperation, SetPayloadOperation
+    ]
+    # Te same zmiany kilku zadań idą jedną operacją; usuwane zadanie nie jest zmieniane
+    assert operacje[0].set_payload.points == [uprawa.zadania[0].id, uprawa.zadania[1].id]
+    assert operacje[2].delete.points == [uprawa.zadania[2].id]
+
+def test_zapis_zmian_w_bazie(client, tryb):
+    zapisz_uprawy_do_bazy(client, {"p": _uprawa()})
+    uprawa, zadania = _wczytaj(client)
+    assert zapisz_zmiany_uprawy(client, "p", uprawa, zadania, {
+        'zmienione': {1: {'zrealizowane': True}}, 'uprawa': {'emoji': "🌱"}
+    })
+    assert _stan(client) == ("Pomidory", "🌱", [
+        (date(2026, 3, 15), "Wysiew", False), (date(2026, 5, 20), "Przesadzanie", True), (date(2026, 8, 1), "Zbiór", False)
+    ])
+    uprawa, zadania = _wczytaj(client)
+    assert zapisz_zmiany_uprawy(client, "p", uprawa, zadania, {
+        'usuniete': [0], 'dodane': [Zadanie(date(2026, 9, 1), "Porządki")]
+    })
+    assert [opis for _, opis, _ in _stan(client)[2]] == ["Przesadzanie", "Zbiór", "Porządki"]
+
+def test_zmiana_po_zapisie_innej_sesji_trafia_w_to_samo_zadanie(client, komunikaty):
+    zapisz_uprawy_do_bazy(client, {"p": _uprawa()})
+    sesja_a = _wczytaj(client)
+    sesja_b = _wczytaj(client)
+    # Sesja B dodaje zadanie na początku listy - pozycje w sesji A są nieaktualne
+    assert dodaj_zadania_do_bazy(client, {"p": [Zadanie(date(2026, 1, 10), "Zamówienie nasion")]}, {"p": sesja_b[0]})
+    assert zapisz_zmiany_uprawy(client, "p", *sesja_a, {'zmienione': {1: {'zrealizowane': True}}, 'usuniete': [2]})
+    assert _stan(client)[2] == [
+        (date(2026, 1, 10), "Zamówienie nasion", False),
+        (date(2026, 3, 15), "Wysiew", False),
+        (date(2026, 5, 20), "Przesadzanie", True)
+    ]
+    assert komunikaty == []
+
+def test_zmiana_zadania_usunietego_w_innej_sesji_nie_jest_zapisywana(client, komunikaty):
+    zapisz_uprawy_do_bazy(client, {"p": _uprawa()})
+    sesja_a = _wczytaj(client)
+    sesja_b = _wczytaj(client)
+    assert zapisz_zmiany_uprawy(client, "p", *sesja_b, {'usuniete': [1]})
+    przed = _stan(client)
+    assert not zapisz_zmiany_uprawy(client, "p", *sesja_a, {'zmienione': {1: {'opis': "Przesadzanie do gruntu"}}})
+    assert _stan(client) == przed
+    assert [poziom for poziom, _ in komunikaty] == ['error']
+
+def test_ustawienia_brak_a_blad_odczytu(client, monkeypatch):
+    assert pobierz_wybrane_uprawy_z_bazy(client) is None
+    zapisz_wybrane_uprawy_do_bazy(client, [])
+    assert pobierz_wybrane_uprawy_z_bazy(client) == []
+
+    def blad(*args, **kwargs):
+        raise ConnectionError("brak połączenia")
+
+    # Błąd odczytu nie może wyglądać jak brak zapisanych ustawień
+    monkeypatch.setattr(client, 'retrieve', blad)
+    with pytest.raises(ConnectionError):
+        pobierz_wybrane_uprawy_z_bazy(client)
+
+def test_przeniesienie_sezonu_z_pracami_w_kolejnym_roku(client, tryb):
+    zapisz_uprawy_do_bazy(client, {"c": Uprawa("Czosnek", [
+        Zadanie(date(2026, 10, 1), "Sadzenie"), Zadanie(date(2027, 1, 15), "Okrycie")
+    ])})
+    assert przenies_ogrod_na_rok(client, pobierz_uprawy_z_bazy(client), ["c"], 2026, 2027) == 2
+    assert [data for data, _, _ in _stan(client, "c")[2]] == [
+        date(2026, 10, 1), date(2027, 1, 15), date(2027, 10, 1), date(2028, 1, 15)
+    ]
+    # Styczeń 2027 należy do sezonu 2026, więc nie trafia do sezonu 2028
+    assert przenies_ogrod_na_rok(client, pobierz_uprawy_z_bazy(client), ["c"], 2027, 2028) == 2
+    assert [data for data, _, _ in _stan(client, "c")[2]][-2:] == [date(2028, 10, 1), date(2029, 1, 15)]
+    # Ponowne przeniesienie niczego nie dubluje
+    assert przenies_ogrod_na_rok(client, pobierz_uprawy_z_bazy(client), ["c"], 2027, 2028) == 0
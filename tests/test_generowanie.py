@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from ogrodniczka.generowanie import ParserZadan, _napraw_date, waliduj_kalendarz
+
+ODPOWIEDZ = json.dumps({
+    "nazwa": "Pomidor \"malinowy\"",
+    "zadania": [
+        {"data": "2026-03-15", "opis": "Wysiew [na rozsadę], {w domu}"},
+        {"data": "2026-05-20", "opis": "Przesadzanie\ndo gruntu"},
+        {"data": "2026-08-01", "opis": "Zbiór"}
+    ]
+}, ensure_ascii=False, indent=2)
+
+def _parsuj(fragmenty):
+    parser = ParserZadan()
+    odebrane = []
+    for fragment in fragmenty:
+        odebrane += parser.dodaj(fragment)
+    return parser, odebrane
+
+def test_parser_zadan_po_znaku():
+    parser, odebrane = _parsuj(ODPOWIEDZ)
+    assert parser.nazwa == "Pomidor \"malinowy\""
+    assert odebrane == json.loads(ODPOWIEDZ)['zadania']
+    assert parser.zadania == odebrane
+    assert parser.zakonczony
+
+@pytest.mark.parametrize("podzial", range(1, len(ODPOWIEDZ)))
+def test_parser_zadan_dowolna_granica_fragmentow(podzial):
+    parser, odebrane = _parsuj([ODPOWIEDZ[:podzial], ODPOWIEDZ[podzial:]])
+    assert odebrane == json.loads(ODPOWIEDZ)['zadania']
+    assert parser.zakonczony
+
+def test_parser_zadan_zadanie_zwracane_po_domknieciu_obiektu():
+    parser = ParserZadan()
+    assert parser.dodaj('{"nazwa": "Marchew", "zadania": [{"data": "2026-04-01", "op') == []
+    assert parser.dodaj('is": "Siew"}') == [{"data": "2026-04-01", "opis": "Siew"}]
+    assert not parser.zakonczony
+
+def test_parser_zadan_ucieta_odpowiedz_zachowuje_odebrane():
+    ucieta = ODPOWIEDZ[:ODPOWIEDZ.index("Zbiór")]
+    parser, odebrane = _parsuj([ucieta])
+    assert [zadanie['opis'] for zadanie in odebrane] == ["Wysiew [na rozsadę], {w domu}", "Przesadzanie\ndo gruntu"]
+    assert not parser.zakonczony
+
+def test_parser_zadan_pomija_obiekty_bez_daty_lub_opisu():
+    parser, odebrane = _parsuj(['{"zadania": [{"opis": "bez daty"}, {"data": "2026-01-01"}, 7, ',
+                                '{"data": "2026-02-01", "opis": "ok"}]}'])
+    assert odebrane == [{"data": "2026-02-01", "opis": "ok"}]
+    assert parser.zakonczony
+
+def test_parser_zadan_pusta_lista():
+    parser, odebrane = _parsuj(['{"nazwa": "X", "zadania": [', ' ]}'])
+    assert odebrane == [] and parser.zakonczony
+
+@pytest.mark.parametrize("tekst, oczekiwana", [
+    ("2026-04-15", "2026-04-15"),
+    ("2027-01-15", "2027-01-15"),
+    ("2025-03-01", "2026-03-01"),
+    ("2031-03-01", "2026-03-01"),
+    ("15.04.2026", "2026-04-15"),
+    ("15.04.2027", "2027-04-15"),
+    ("15/04/26", "2026-04-15"),
+    ("15.04", "2026-04-15"),
+    ("2026-04-31", "2026-04-30"),
+    ("2027-02-29", "2027-02-28"),
+    ("2026-4-5", "2026-04-05"),
+    ("2026-04", None),
+    ("2026-13-01", None),
+    ("2026-04-00", None),
+    ("kwiecień", None),
+    (None, None),
+])
+def test_napraw_date(tekst, oczekiwana):
+    assert _napraw_date(tekst, 2026) == oczekiwana
+
+def test_napraw_date_dzien_przycinany_w_zachowanym_roku():
+    # 2028 jest przestępny, 2027 nie
+    assert _napraw_date("2028-02-29", 2027) == "2028-02-29"
+    assert _napraw_date("2027-02-29", 2027) == "2027-02-28"
+
+def test_waliduj_kalendarz_naprawia_i_sortuje():
+    kalendarz, poprawki = waliduj_kalendarz({
+        "nazwa": " ",
+        "zadania": [
+            {"data": "2026-06-31", "opis": " Podlewanie "},
+            {"data": "2026-03-01", "opis": "Siew"},
+            {"data": "2026-03-01", "opis": "siew"},
+            {"data": "jutro", "opis": "Coś"},
+            {"data": "2026-05-01", "opis": ""},
+            "tekst"
+        ]
+    }, 2026, "Pomidor")
+    assert kalendarz == {
+        "nazwa": "Pomidor",
+        "zadania": [{"data": "2026-03-01", "opis": "Siew"}, {"data": "2026-06-30", "opis": "Podlewanie"}]
+    }
+    assert len(poprawki) == 5
+
+def test_waliduj_kalendarz_zostawia_prace_w_kolejnym_roku():
+    kalendarz, poprawki = waliduj_kalendarz({
+        "nazwa": "Czosnek",
+        "zadania": [
+            {"data": "2026-10-01", "opis": "Sadzenie"},
+            {"data": "2027-01-15", "opis": "Okrycie na zimę"},
+            {"data": "2026-01-15", "opis": "Okrycie na zimę"}
+        ]
+    }, 2026)
+    assert [zadanie['data'] for zadanie in kalendarz['zadania']] == ["2026-01-15", "2026-10-01", "2027-01-15"]
+    assert poprawki == []
+
+@pytest.mark.parametrize("kalendarz", [
+    {"nazwa": "X"},
+    {"nazwa": "X", "zadania": "brak"},
+    {"nazwa": "X", "zadania": [{"data": "zła", "opis": "x"}]},
+    [],
+])
+def test_waliduj_kalendarz_bez_poprawnych_zadan(kalendarz):
+    with pytest.raises(ValueError):
+        waliduj_kalendarz(kalendarz, 2026, "X")
@@ -0,0 +1,96 @@
+from datetime import date
+
+import pytest
+
+from ogrodniczka import ics
+from ogrodniczka.baza import pobierz_uprawy_z_bazy, zapisz_uprawy_do_bazy
+from ogrodniczka.ics import _linia_ics, _tekst_ics, kalendarz_ics, wydarzenia_ics
+from ogrodniczka.model import Uprawa, Zadanie
+
+def _rozwin(tekst):
+    return tekst.replace("\r\n ", "")
+
+def _uid(blok):
+    return [linia for linia in _rozwin(blok).split("\r\n") if linia.startswith("UID:")]
+
+@pytest.fixture(autouse=True)
+def pusta_pamiec(monkeypatch):
+    monkeypatch.setattr(ics, '_pamiec_ics', {})
+
+def test_tekst_ics_escapuje_znaki_specjalne():
+    assert _tekst_ics("a\\b;c,d\ne") == "a\\\\b\\;c\\,d\\ne"
+    assert _tekst_ics("Pomidor: wysiew") == "Pomidor: wysiew"
+
+def test_krotka_linia_bez_zawijania():
+    assert _linia_ics("SUMMARY:" + "x" * 67) == "SUMMARY:" + "x" * 67 + "\r\n"
+
+@pytest.mark.parametrize("linia", [
+    "SUMMARY:" + "x" * 200,
+    "SUMMARY:" + "ąęółżź" * 40,
+    "SUMMARY:" + "🥕a" * 50,
+    "SUMMARY:" + "x" * 67 + "ą" * 3,
+])
+def test_zawijanie_co_75_bajtow(linia):
+    wynik = _linia_ics(linia)
+    assert wynik.endswith("\r\n")
+    fizyczne = wynik[:-2].split("\r\n")
+    assert len(fizyczne) > 1
+    # Dekodowanie każdej linii osobno - znak UTF-8 nie jest rozcięty
+    assert all(len(fizyczna.encode('utf-8')) <= 75 for fizyczna in fizyczne)
+    assert all(fizyczna.startswith(" ") for fizyczna in fizyczne[1:])
+    assert _rozwin(wynik) == linia + "\r\n"
+
+def test_uid_stale_i_unikalne():
+    uprawa = Uprawa("Pomidory, malinowe", [
+        Zadanie(date(2026, 3, 15), "Wysiew"),
+        Zadanie(date(2026, 3, 15), "Wysiew"),
+        Zadanie(date(2026, 5, 20), "Przesadzanie; do gruntu", True)
+    ], zaktualizowano=1_780_000_000)
+    blok = wydarzenia_ics("p", uprawa, uprawa.zadania)
+    assert len(set(_uid(blok))) == 3
+    assert _uid(wydarzenia_ics("p", uprawa, uprawa.zadania)) == _uid(blok)
+    # Dopisanie zadania nie zmienia UID pozostałych
+    dluzsza = uprawa.zadania + [Zadanie(date(2026, 1, 1), "Zamówienie nasion")]
+    assert _uid(wydarzenia_ics("p", uprawa, dluzsza))[:3] == _uid(blok)
+    assert "SUMMARY:✅ Pomidory\\, malinowe: Przesadzanie\\; do gruntu" in _rozwin(blok)
+    assert "DTSTART;VALUE=DATE:20260315\r\nDTEND;VALUE=DATE:20260316" in blok
+
+def test_uid_z_id_zadania():
+    uprawa = Uprawa("Marchew")
+    zadanie = Zadanie(date(2026, 4, 1), "Siew", id="00000000-0000-0000-0000-000000000001")
+    zmienione = Zadanie(date(2026, 4, 8), "Siew poprawkowy", id=zadanie.id)
+    assert _uid(wydarzenia_ics("m", uprawa, [zadanie])) == _uid(wydarzenia_ics("m", uprawa, [zmienione]))
+    assert _uid(wydarzenia_ics("m", uprawa, [zadanie])) != _uid(wydarzenia_ics("n", uprawa, [zadanie]))
+
+def test_kalendarz_wybranych_upraw(client, tryb):
+    zapisz_uprawy_do_bazy(client, {
+        "p": Uprawa("Pomidory", [Zadanie(date(2026, 3, 15), "Wysiew")]),
+        "m": Uprawa("Marchew", [Zadanie(date(2026, 4, 1), "Siew " + "bardzo długi opis " * 10)])
+    })
+    tekst = kalendarz_ics(client, pobierz_uprawy_z_bazy(client), ["m", "brak"])
+    assert tekst.startswith("BEGIN:VCALENDAR\r\n") and tekst.endswith("END:VCALENDAR\r\n")
+    assert "\n" not in tekst.replace("\r\n", "")
+    assert all(len(linia.encode('utf-8')) <= 75 for linia in tekst.split("\r\n"))
+    rozwiniety = _rozwin(tekst)
+    assert rozwiniety.count("BEGIN:VEVENT") == 1
+    assert "SUMMARY:Marchew: Siew bardzo" in rozwiniety and "Pomidory" not in rozwiniety
+
+def test_kalendarz_przelicza_tylko_zmienione_uprawy(monkeypatch):
+    wywolania = []
+    oryginal = ics.wydarzenia_ics
+
+    def liczone(uprawa_id, uprawa, zadania):
+        wywolania.append(uprawa_id)
+        return oryginal(uprawa_id, uprawa, zadania)
+
+    monkeypatch.setattr(ics, 'wydarzenia_ics', liczone)
+    uprawy = {
+        "p": Uprawa("Pomidory", [Zadanie(date(2026, 3, 15), "Wysiew")], zaktualizowano=1.0),
+        "m": Uprawa("Marchew", [Zadanie(date(2026, 4, 1), "Siew")], zaktualizowano=1.0)
+    }
+    pierwszy = kalendarz_ics(None, uprawy, ["p", "m"])
+    assert kalendarz_ics(None, uprawy, ["p", "m"]) == pierwszy
+    assert sorted(wywolania) == ["m", "p"]
+    uprawy["m"] = Uprawa("Marchew", [Zadanie(date(2026, 4, 2), "Siew")], zaktualizowano=2.0)
+    assert "20260402" in kalendarz_ics(None, uprawy, ["p", "m"])
+    assert sorted(wywolania) == ["m", "m", "p"]
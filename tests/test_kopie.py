@@ -0,0 +1,99 @@
+import io
+from datetime import date
+
+import pytest
+
+from ogrodniczka.baza import (
+    ROZMIAR_PACZKI, tryb_zadan, pobierz_uprawy_z_bazy, pobierz_wybrane_uprawy_z_bazy, pobierz_zadania_uprawy,
+    zapisz_uprawy_do_bazy, zapisz_wybrane_uprawy_do_bazy
+)
+from ogrodniczka.kopie import eksportuj_kopie, importuj_kopie, rekordy_z_pliku
+from ogrodniczka.model import Uprawa, Zadanie
+
+def _ogrod():
+    uprawy = {
+        f"u{i}": Uprawa(f"Uprawa {i}", [
+            Zadanie(date(2026, 1 + j % 12, 1 + j % 28), f"Zadanie {j}; przecinek, \"cudzysłów\" ąę", j % 3 == 0)
+            for j in range(30)
+        ], "🥕" if i % 2 else None)
+        for i in range(20)
+    }
+    uprawy["pusta"] = Uprawa("Bez zadań, ale z nazwą")
+    return uprawy
+
+def _stan(client):
+    uprawy = pobierz_uprawy_z_bazy(client)
+    return {
+        uprawa_id: (uprawa.nazwa, uprawa.emoji, sorted(
+            (zadanie.data, zadanie.opis, zadanie.zrealizowane)
+            for zadanie in (pobierz_zadania_uprawy(client, uprawa_id) if tryb_zadan() else uprawa.zadania)
+        ))
+        for uprawa_id, uprawa in uprawy.items()
+    }
+
+@pytest.mark.parametrize("format", ["ndjson", "csv", "parquet"])
+def test_kopia_w_obie_strony(client, nowa_baza, tryb, format):
+    uprawy = _ogrod()
+    zapisz_uprawy_do_bazy(client, uprawy)
+    zapisz_wybrane_uprawy_do_bazy(client, ["u1", "pusta"])
+    plik = io.BytesIO()
+    eksportuj_kopie(client, plik, format)
+
+    cel = nowa_baza()
+    plik.seek(0)
+    zaimportowane, liczba_zadan, wybrane = importuj_kopie(cel, rekordy_z_pliku(plik, format))
+    assert sorted(zaimportowane) == sorted(uprawy)
+    assert liczba_zadan == 20 * 30
+    # Ustawienia są tylko w pełnej kopii NDJSON
+    assert wybrane == (["u1", "pusta"] if format == "ndjson" else None)
+    assert _stan(cel) == _stan(client)
+    # Ponowny import tego samego pliku niczego nie dubluje
+    plik.seek(0)
+    importuj_kopie(cel, rekordy_z_pliku(plik, format))
+    assert _stan(cel) == _stan(client)
+    assert pobierz_wybrane_uprawy_z_bazy(cel) is None
+
+def test_import_wielu_paczek(client, tryb):
+    duza = {"duza": Uprawa("Duża", [Zadanie(date(2026, 5, 1), f"Zadanie {j}") for j in range(ROZMIAR_PACZKI * 2 + 5)])}
+    rekordy = [{"typ": "uprawa", "uprawa_id": "duza", "nazwa": "Duża"}] + [
+        {"typ": "zadanie", "uprawa_id": "duza", **zadanie.payload()} for zadanie in duza["duza"].zadania
+    ] + [{"typ": "uprawa", "uprawa_id": f"m{i}", "nazwa": f"Mała {i}"} for i in range(ROZMIAR_PACZKI + 1)]
+    zaimportowane, liczba_zadan, _ = importuj_kopie(client, iter(rekordy))
+    assert len(zaimportowane) == ROZMIAR_PACZKI + 2
+    assert liczba_zadan == ROZMIAR_PACZKI * 2 + 5
+    assert len(_stan(client)["duza"][2]) == ROZMIAR_PACZKI * 2 + 5
+
+def test_rekordy_uprawy_rozdzielone_miedzy_paczki(client):
+    rekordy = [{"typ": "uprawa", "uprawa_id": f"m{i}", "nazwa": f"Mała {i}"} for i in range(ROZMIAR_PACZKI + 1)]
+    rekordy.append({"typ": "zadanie", "uprawa_id": "m0", "data": "2026-01-01", "opis": "x"})
+    with pytest.raises(ValueError, match=f"^rekord {ROZMIAR_PACZKI + 2}: .*nie są obok siebie"):
+        importuj_kopie(client, iter(rekordy))
+
+@pytest.mark.parametrize("rekordy, nr", [
+    ([{"typ": "uprawa", "uprawa_id": "a", "nazwa": "A"}, {"typ": "punkt"}], 2),
+    ([{"typ": "zadanie", "uprawa_id": "a", "data": "zła", "opis": "x"}], 1),
+    ([{"typ": "zadanie", "uprawa_id": "a", "opis": "bez daty"}], 1),
+    (["nie rekord"], 1),
+])
+def test_bledny_rekord_z_numerem(client, rekordy, nr):
+    with pytest.raises(ValueError, match=f"^rekord {nr}:"):
+        importuj_kopie(client, iter(rekordy))
+
+def test_csv_z_pustymi_komorkami(client):
+    plik = io.BytesIO(
+        "uprawa_id,nazwa,emoji,data,opis,zrealizowane\n"
+        "a,,,2026-04-01,Siew,tak\n"
+        "a,,,,,\n"
+        "b,Buraki,🟥,,,\n".encode("utf-8")
+    )
+    importuj_kopie(client, rekordy_z_pliku(plik, "csv"))
+    assert _stan(client) == {
+        "a": ("a", None, [(date(2026, 4, 1), "Siew", True)]),
+        "b": ("Buraki", "🟥", [])
+    }
+
+def test_nieznany_format(client):
+    with pytest.raises(ValueError):
+        eksportuj_kopie(client, io.BytesIO(), "xlsx")
+    with pytest.raises(ValueError):
+        list(rekordy_z_pliku(io.BytesIO(), "xlsx"))
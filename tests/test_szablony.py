@@ -0,0 +1,89 @@
+import json
+from datetime import date
+from types import SimpleNamespace
+
+from ogrodniczka.generowanie import (
+    klucz_szablonu_ai, pobierz_szablony_ai_z_cache, wygeneruj_kalendarz_z_cache, wygeneruj_wiele_kalendarzy,
+    zapisz_szablony_ai_do_cache
+)
+from ogrodniczka.model import Uprawa, Zadanie
+from ogrodniczka.szablony import instancjonuj_szablon, szablon_z_terminow, utworz_szablon
+
+def _daty(uprawa):
+    return [zadanie.data for zadanie in uprawa.zadania]
+
+def test_szablon_na_inny_rok():
+    szablon = utworz_szablon("Marchew", [Zadanie(date(2026, 4, 1), "Siew"), Zadanie(date(2026, 7, 20), "Zbiór")])
+    assert szablon == {'nazwa': "Marchew", 'miesiace': [4, 7], 'dni': [1, 20], 'lata': [0, 0], 'opisy': ["Siew", "Zbiór"]}
+    uprawa = instancjonuj_szablon(szablon, 2031)
+    assert uprawa.nazwa == "Marchew"
+    assert _daty(uprawa) == [date(2031, 4, 1), date(2031, 7, 20)]
+    assert [zadanie.opis for zadanie in uprawa.zadania] == ["Siew", "Zbiór"]
+
+def test_szablon_29_lutego():
+    szablon = utworz_szablon("Rzodkiewka", [Zadanie(date(2028, 2, 29), "Siew pod osłonami")])
+    assert _daty(instancjonuj_szablon(szablon, 2027)) == [date(2027, 2, 28)]
+    assert _daty(instancjonuj_szablon(szablon, 2032)) == [date(2032, 2, 29)]
+
+def test_szablon_z_pracami_w_kolejnym_roku():
+    szablon = utworz_szablon("Czosnek", [Zadanie(date(2026, 10, 1), "Sadzenie"), Zadanie(date(2027, 1, 15), "Okrycie")])
+    assert szablon['lata'] == [0, 1]
+    assert _daty(instancjonuj_szablon(szablon, 2030)) == [date(2030, 10, 1), date(2031, 1, 15)]
+
+def test_szablon_z_terminow_i_pusty():
+    szablon = szablon_z_terminow("Ogórki", [(5, 20, "Przesadzanie"), (2, 30, "Siew")])
+    assert szablon['lata'] == [0, 0]
+    assert _daty(instancjonuj_szablon(szablon, 2026)) == [date(2026, 5, 20), date(2026, 2, 28)]
+    assert instancjonuj_szablon(utworz_szablon("Pusta", []), 2026).zadania == []
+
+def test_pamiec_podreczna_szablonow(client):
+    szablon = utworz_szablon("Bazylia", [Zadanie(date(2026, 5, 1), "Wysiew")])
+    zapisz_szablony_ai_do_cache(client, {klucz_szablonu_ai("Bazylia"): szablon})
+    # Ta sama znormalizowana nazwa trafia w ten sam wpis
+    assert pobierz_szablony_ai_z_cache(client, [klucz_szablonu_ai(" bazylia "), "v0:brak"]) == {
+        klucz_szablonu_ai(" bazylia "): szablon
+    }
+    # Trafienie w pamięci nie wymaga klienta OpenAI
+    uprawa = wygeneruj_kalendarz_z_cache(client, None, "BAZYLIA", 2029)
+    assert _daty(uprawa) == [date(2029, 5, 1)]
+
+# Klient OpenAI zwracający zawsze ten sam kalendarz i zapamiętujący prompty
+class _KlientOpenAI:
+    def __init__(self):
+        self.prompty = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._utworz))
+
+    def _utworz(self, **parametry):
+        self.prompty.append(parametry['messages'][-1]['content'])
+        tresc = json.dumps({"nazwa": "Bazylia", "zadania": [{"data": "2026-05-01", "opis": "Wysiew"}]})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=tresc))])
+
+    def with_options(self, **opcje):
+        return self
+
+def _przyklady(nazwy):
+    return {nazwa: [Uprawa("Mięta", [Zadanie(date(2025, 4, 10), "Sadzenie")])] for nazwa in nazwy}
+
+def test_kalendarz_z_przykladami_nie_trafia_pod_wspolny_klucz(client):
+    openai = _KlientOpenAI()
+    uprawa = wygeneruj_kalendarz_z_cache(client, openai, "Bazylia", 2026, dobierz_przyklady=_przyklady)
+    assert _daty(uprawa) == [date(2026, 5, 1)] and "Mięta" in openai.prompty[0]
+    assert pobierz_szablony_ai_z_cache(client, [klucz_szablonu_ai("Bazylia")]) == {}
+    # Te same przykłady w innym roku trafiają w zapisany kalendarz
+    assert _daty(wygeneruj_kalendarz_z_cache(client, openai, "Bazylia", 2027, dobierz_przyklady=_przyklady)) == [
+        date(2027, 5, 1)
+    ]
+    assert len(openai.prompty) == 1
+    # Bez przykładów kalendarz jest generowany osobno i zapisywany pod wspólnym kluczem
+    wygeneruj_kalendarz_z_cache(client, openai, "Bazylia", 2026)
+    assert len(openai.prompty) == 2 and "Mięta" not in openai.prompty[1]
+    assert list(pobierz_szablony_ai_z_cache(client, [klucz_szablonu_ai("Bazylia")])) == [klucz_szablonu_ai("Bazylia")]
+
+def test_wiele_kalendarzy_z_przykladami(client):
+    openai, nazwy = _KlientOpenAI(), ["Bazylia", "Lubczyk"]
+    kalendarze, bledy = wygeneruj_wiele_kalendarzy(client, openai, nazwy, 2026, dobierz_przyklady=_przyklady)
+    assert sorted(kalendarze) == ["Bazylia", "Lubczyk"] and bledy == {}
+    assert pobierz_szablony_ai_z_cache(client, [klucz_szablonu_ai("Bazylia"), klucz_szablonu_ai("Lubczyk")]) == {}
+    kalendarze, _ = wygeneruj_wiele_kalendarzy(client, openai, nazwy, 2027, dobierz_przyklady=_przyklady)
+    assert len(openai.prompty) == 2
+    assert _daty(kalendarze["Lubczyk"]) == [date(2027, 5, 1)]